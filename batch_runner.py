@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import time
+import uuid
+from dotenv import load_dotenv
+from langgraph.checkpoint.memory import MemorySaver
+from src import metrics, throttle, tracing
+from src.graph import workflow
+from src.output import ResultWriter
+from src.results import extract_result
+from src.serialization import loads
+
+load_dotenv()
+
+
+def read_requests(path: str):
+    """Reads `{dish, servings}` requests from a JSONL file, skipping blank lines."""
+    requests = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            request = loads(line)
+            request.setdefault("id", f"line-{line_no}")
+            requests.append(request)
+    return requests
+
+
+async def run_one(app, request: dict, semaphore: asyncio.Semaphore) -> dict:
+    async with semaphore:
+        thread_id = f"{request['id']}-{uuid.uuid4().hex[:8]}"
+        config = {"configurable": {"thread_id": thread_id, "render": False}, "callbacks": tracing.callbacks(thread_id)}
+        initial_state = {
+            "dish": request["dish"],
+            "servings": request.get("servings", 2),
+        }
+        started = time.perf_counter()
+        try:
+            with metrics.run(thread_id), throttle.priority(throttle.BATCH):
+                final_state = await app.ainvoke(initial_state, config=config)
+            result = {"status": "ok", **extract_result(final_state)}
+        except Exception as e:
+            result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        result.update(
+            id=request["id"],
+            dish=request["dish"],
+            servings=request.get("servings", 2),
+            thread_id=thread_id,
+            elapsed=round(time.perf_counter() - started, 3),
+        )
+        return result
+
+
+async def flush_every(writer: ResultWriter, interval: float):
+    """Flushes `writer` on a timer, so finished results show up even while the next one is slow."""
+    while True:
+        await asyncio.sleep(interval)
+        writer.flush()
+
+
+async def run_batch(input_path: str, output_path: str, concurrency: int, fmt: str = "ndjson"):
+    """
+    Runs every request concurrently and streams each result to `output_path` as it finishes,
+    as NDJSON or a JSON array. Output is buffered and flushed at least once a second.
+    """
+    requests = read_requests(input_path)
+    app = workflow.compile(checkpointer=MemorySaver())
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.create_task(run_one(app, request, semaphore)) for request in requests]
+
+    started = time.perf_counter()
+    failed = 0
+    with open(output_path, "wb") as out, ResultWriter(out, fmt) as writer:
+        flusher = asyncio.create_task(flush_every(writer, 1.0))
+        try:
+            for done in asyncio.as_completed(tasks):
+                result = await done
+                failed += result["status"] != "ok"
+                writer.write(result)
+        finally:
+            flusher.cancel()
+    elapsed = time.perf_counter() - started
+    rate = len(requests) / elapsed * 60 if elapsed else 0
+    print(f"Processed {len(requests)} requests ({failed} failed) in {elapsed:.1f}s - {rate:.0f} requests/min")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many Foodie requests concurrently.")
+    parser.add_argument("input", help="JSONL file with one {\"dish\": ..., \"servings\": ...} per line")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="File to stream results into")
+    parser.add_argument("-f", "--format", choices=["ndjson", "json"], default="ndjson", help="One object per line, or a JSON array")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Maximum requests in flight")
+    args = parser.parse_args()
+    asyncio.run(run_batch(args.input, args.output, args.concurrency, args.format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the "what can I cook now?" query over a synthetic recipe library.
+
+Builds a library of N random recipes drawn from an ingredient vocabulary, then
+times loading the recipe x ingredient matrix and scoring it against a pantry.
+
+    python benchmarks/cook_now.py --recipes 1000 10000 50000 --pantry 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.recipe_library import RecipeLibrary  # noqa: E402
+
+UNITS = ["g", "ml", "tsp", "tbsp", "cup", "medium", "cloves", "to taste"]
+
+
+def synthetic_recipes(count: int, vocabulary: int, rng: random.Random):
+    for i in range(count):
+        ingredients = {
+            f"ingredient {j}": {"quantity": "to taste" if unit == "to taste" else str(rng.randint(1, 400)), "unit": unit}
+            for j, unit in ((rng.randrange(vocabulary), rng.choice(UNITS)) for _ in range(rng.randint(4, 14)))
+        }
+        yield f"dish {i}", {"recipe_name": f"Dish {i}", "ingredients": ingredients, "instructions": ["Cook.", "Serve."]}
+
+
+def synthetic_pantry(size: int, vocabulary: int, rng: random.Random) -> dict:
+    return {
+        "items": {
+            f"ingredient {j}": {"quantity": str(rng.randint(0, 1000)), "unit": rng.choice(UNITS[:-1])}
+            for j in rng.sample(range(vocabulary), min(size, vocabulary))
+        }
+    }
+
+
+def bench(count: int, args) -> dict:
+    rng = random.Random(count)
+    library = RecipeLibrary(os.path.join(tempfile.mkdtemp(prefix="foodie-library-"), "recipe_library.db"))
+    started = time.perf_counter()
+    library.add_many(synthetic_recipes(count, args.vocabulary, rng))
+    added = time.perf_counter() - started
+
+    started = time.perf_counter()
+    library.matrix()
+    loaded = time.perf_counter() - started
+
+    pantry = synthetic_pantry(args.pantry, args.vocabulary, rng)
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        library.cook_now(pantry, k=args.k)
+        samples.append(time.perf_counter() - started)
+    return {
+        "recipes": count,
+        "entries": len(library.matrix().cols),
+        "add_s": added,
+        "load_s": loaded,
+        "query_p50_ms": statistics.median(samples) * 1000,
+        "query_max_ms": max(samples) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--vocabulary", type=int, default=2000, help="Distinct ingredients across the library")
+    parser.add_argument("--pantry", type=int, default=200, help="Inventory items")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>8} {'entries':>8} {'add':>8} {'load':>8} {'query p50':>10} {'query max':>10}")
+    for count in args.recipes:
+        r = bench(count, args)
+        print(
+            f"{r['recipes']:>8} {r['entries']:>8} {r['add_s']:>7.2f}s {r['load_s']:>7.2f}s "
+            f"{r['query_p50_ms']:>8.1f}ms {r['query_max_ms']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
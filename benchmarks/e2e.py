@@ -0,0 +1,217 @@
+"""
+Offline end-to-end benchmark of src.graph.workflow.
+
+Search results and Recipe tool calls are replayed from fixtures/recordings
+(or synthesized) with simulated latency, so the numbers measure our own
+pipeline rather than Groq or DuckDuckGo. Results are written to
+benchmarks/results/<commit>.json for comparison between commits.
+
+    python benchmarks/e2e.py --pantry-sizes 50 1000 10000 --llm-latency 0.4
+    python benchmarks/e2e.py --compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("GROQ_API_KEY", "offline")
+
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+from src import metrics  # noqa: E402
+from src.config import set_llm  # noqa: E402
+from src.graph import workflow  # noqa: E402
+from src.inventory_store import SQLiteInventoryStore, set_inventory_store  # noqa: E402
+from src.recipe_cache import RecipeCache, set_recipe_cache  # noqa: E402
+from src.recipe_library import RecipeLibrary, set_recipe_library  # noqa: E402
+from src.replay import SYNTHETIC_INGREDIENTS, LatencyProvider, ReplayLLM  # noqa: E402
+from src.search import CachedSearch, FixtureProvider, set_search  # noqa: E402
+from src.shopping_ledger import ShoppingLedger, set_shopping_ledger  # noqa: E402
+from src.throttle import RateLimiter, set_rate_limiter  # noqa: E402
+from src.tracing import FileSink, TraceExporter, callbacks, set_exporter  # noqa: E402
+from src.serialization import dump_file, load_file, loads  # noqa: E402
+
+UNITS = ["g", "ml", "tsp", "tbsp", "cup", "medium", "cloves"]
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)]  # noqa: E731
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "mean": statistics.fmean(ordered)}
+
+
+def synthetic_pantry(size: int) -> dict:
+    rng = random.Random(size)
+    items = {name: {"quantity": str(rng.randint(0, 20) * 50), "unit": unit} for name, _, unit in SYNTHETIC_INGREDIENTS}
+    for i in range(max(size - len(items), 0)):
+        items[f"pantry item {i}"] = {"quantity": str(rng.randint(0, 500)), "unit": rng.choice(UNITS)}
+    return {"items": items}
+
+
+def read_requests(path: str) -> list:
+    with open(path, "rb") as f:
+        requests = [loads(line) for line in f if line.strip()]
+    return [r for r in requests if "dish" in r]
+
+
+def run_request(app, request: dict, thread_id: str, trace_sample_rate: float = 0.0) -> dict:
+    """Runs one request through the graph; node times come from the instrumented nodes, so parallel branches are timed separately."""
+    config = {"configurable": {"thread_id": thread_id, "render": False}, "callbacks": callbacks(thread_id, trace_sample_rate)}
+    with metrics.run(thread_id, sink=False) as run:
+        app.invoke({"dish": request["dish"], "servings": request.get("servings", 2)}, config)
+    return {"total": run.wall, "nodes": dict(run.nodes), "counters": dict(run.counters)}
+
+
+def run_pantry(size: int, requests: list, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"foodie-bench-{size}-")
+    os.chdir(workdir)
+    pantry = os.path.join(workdir, "inventory.json")
+    dump_file(synthetic_pantry(size), pantry)
+    store = SQLiteInventoryStore(os.path.join(workdir, "inventory.db"))
+    store.import_json(pantry)
+    set_inventory_store(store)
+    set_shopping_ledger(ShoppingLedger(os.path.join(workdir, "shopping_list.db")))
+    set_recipe_cache(RecipeCache(os.path.join(workdir, "recipe_cache.db"), ttl=args.cache_ttl, max_entries=1000))
+    set_recipe_library(RecipeLibrary(os.path.join(workdir, "recipe_library.db")))
+    provider = FixtureProvider(args.search_fixtures, default="Season to taste. Cook until done.")
+    set_search(CachedSearch(LatencyProvider(provider, args.search_latency), max_entries=0))
+    recordings = load_file(args.recordings) if args.recordings else {}
+    set_llm(ReplayLLM(recordings, args.llm_latency), "large")
+    set_llm(ReplayLLM(recordings, args.fast_llm_latency, args.fast_reject_rate), "fast")
+    for name in ("fast", "large"):
+        set_rate_limiter(name, RateLimiter(args.llm_rpm, args.llm_tpm))
+    set_rate_limiter("search", RateLimiter())
+    exporter = TraceExporter(FileSink(os.path.join(workdir, "traces.jsonl"))) if args.trace_sample_rate else None
+    set_exporter(exporter)
+    app = workflow.compile(checkpointer=MemorySaver())
+
+    jobs = [requests[i % len(requests)] for i in range(args.iterations)]
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        runs = list(executor.map(
+            lambda ij: run_request(app, ij[1], f"bench-{size}-{ij[0]}", args.trace_sample_rate), enumerate(jobs)
+        ))
+    elapsed = time.perf_counter() - started
+    if exporter is not None:
+        exporter.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    node_names = sorted({node for run in runs for node in run["nodes"]})
+    counters = {}
+    for run in runs:
+        for name, value in run["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+    return {
+        "pantry_size": size,
+        "requests": len(runs),
+        "throughput_per_min": len(runs) / elapsed * 60,
+        "end_to_end": percentiles([run["total"] for run in runs]),
+        "nodes": {node: percentiles([run["nodes"][node] for run in runs if node in run["nodes"]]) for node in node_names},
+        "peak_memory_mb": peak / 1e6,
+        "counters": counters,
+        "tracing": {"exported": exporter.exported, "dropped": exporter.dropped} if exporter else {},
+    }
+
+
+def commit_id() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def report(results: dict):
+    print(f"commit {results['commit']}  llm latency {results['settings']['llm_latency']}s  "
+          f"search latency {results['settings']['search_latency']}s  concurrency {results['settings']['concurrency']}")
+    for run in results["runs"]:
+        e2e = run["end_to_end"]
+        print(f"\npantry {run['pantry_size']:>6}: {run['throughput_per_min']:8.1f} req/min  "
+              f"p50 {e2e['p50'] * 1000:8.1f} ms  p90 {e2e['p90'] * 1000:8.1f} ms  p99 {e2e['p99'] * 1000:8.1f} ms  "
+              f"peak {run['peak_memory_mb']:.1f} MB")
+        for node, stats in run["nodes"].items():
+            print(f"    {node:<20} p50 {stats['p50'] * 1000:8.2f} ms  p90 {stats['p90'] * 1000:8.2f} ms  p99 {stats['p99'] * 1000:8.2f} ms")
+        counters = run.get("counters", {})
+        if counters.get("prompt_tokens_raw"):
+            print(f"    prompt tokens        {counters['prompt_tokens_raw']} raw -> {counters.get('prompt_tokens_distilled', 0)} distilled (estimated)")
+        if counters.get("llm_coalesced") or counters.get("search_coalesced") or counters.get("rate_limit_wait_ms"):
+            print(f"    coalesced            {counters.get('llm_coalesced', 0)} llm / {counters.get('search_coalesced', 0)} search calls, "
+                  f"{counters.get('rate_limit_wait_ms', 0)} ms queued for rate limits")
+        for tier in ("fast", "large"):
+            hits, rejected = counters.get(f"llm_tier_{tier}_hits", 0), counters.get(f"llm_tier_{tier}_rejected", 0)
+            if hits + rejected:
+                print(f"    llm tier {tier:<11} {hits}/{hits + rejected} accepted ({hits / (hits + rejected) * 100:.0f}%)")
+        tracing = run.get("tracing")
+        if tracing:
+            wall = e2e["mean"] * run["requests"]
+            print(f"    tracing              {tracing['exported']} traces exported, {tracing['dropped']} dropped, "
+                  f"{counters.get('trace_callback_us', 0) / 1000:.1f} ms in callbacks "
+                  f"({counters.get('trace_callback_us', 0) / 1e6 / wall * 100 if wall else 0:.2f}% of request time)")
+
+
+def compare(before_path: str, after_path: str):
+    before, after = load_file(before_path), load_file(after_path)
+    print(f"{before['commit']} -> {after['commit']}")
+    previous = {run["pantry_size"]: run for run in before["runs"]}
+    for run in after["runs"]:
+        old = previous.get(run["pantry_size"])
+        if old is None:
+            continue
+        change = lambda new, base: f"{(new - base) / base * 100:+.1f}%" if base else "n/a"  # noqa: E731
+        print(f"pantry {run['pantry_size']:>6}: p50 {change(run['end_to_end']['p50'], old['end_to_end']['p50'])}  "
+              f"p99 {change(run['end_to_end']['p99'], old['end_to_end']['p99'])}  "
+              f"throughput {change(run['throughput_per_min'], old['throughput_per_min'])}  "
+              f"peak memory {change(run['peak_memory_mb'], old['peak_memory_mb'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the Foodie workflow.")
+    parser.add_argument("--requests", default=os.path.join(ROOT, "benchmarks", "requests.jsonl"))
+    parser.add_argument("--pantry-sizes", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=50, help="Requests per pantry size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call")
+    parser.add_argument("--fast-llm-latency", type=float, default=0.0, help="Simulated seconds per fast-tier LLM call")
+    parser.add_argument("--fast-reject-rate", type=float, default=0.0, help="Share of fast-tier answers that fail validation")
+    parser.add_argument("--llm-rpm", type=int, default=0, help="Client-side requests/min limit per model tier (0: none)")
+    parser.add_argument("--llm-tpm", type=int, default=0, help="Client-side tokens/min limit per model tier (0: none)")
+    parser.add_argument("--trace-sample-rate", type=float, default=0.0, help="Share of requests traced to a trace file (0: off)")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Simulated seconds per search")
+    parser.add_argument("--recordings", default="", help="JSON of recorded Recipe tool calls by dish (see FOODIE_RECORD_LLM)")
+    parser.add_argument("--search-fixtures", default=os.path.join(ROOT, "fixtures", "search.json"))
+    parser.add_argument("--cache-ttl", type=int, default=0, help="Recipe cache TTL; 0 disables cache hits")
+    parser.add_argument("--output", default="", help="Where to save results (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+
+    args.search_fixtures = os.path.abspath(args.search_fixtures)
+    args.recordings = os.path.abspath(args.recordings) if args.recordings else ""
+    requests = read_requests(args.requests)
+    results = {
+        "commit": commit_id(),
+        "timestamp": time.time(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        "runs": [run_pantry(size, requests, args) for size in args.pantry_sizes],
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    dump_file(results, output, indent=True)
+    report(results)
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compares stdlib json (indent=4, as the data files used to be written), stdlib
+compact and src.serialization on recipe, inventory and shopping-list payloads.
+
+    python benchmarks/serialization.py --sizes 50 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import serialization  # noqa: E402
+
+UNITS = ["g", "kg", "ml", "l", "tsp", "tbsp", "cup", "medium", "cloves", "pinch"]
+
+
+def recipe_payload(n_ingredients: int = 15) -> dict:
+    return {
+        "recipe_name": "Palak Paneer",
+        "ingredients": {
+            f"ingredient {i}": {"quantity": str(random.randint(1, 500)), "unit": random.choice(UNITS)}
+            for i in range(n_ingredients)
+        },
+        "instructions": [f"Step {i}: stir the pan and simmer for {i + 2} minutes until fragrant." for i in range(10)],
+    }
+
+
+def inventory_payload(size: int) -> dict:
+    return {
+        "items": {
+            f"pantry item {i}": {"quantity": f"{random.uniform(0, 100):.1f}", "unit": random.choice(UNITS)}
+            for i in range(size)
+        }
+    }
+
+
+def shopping_payload(size: int) -> dict:
+    return {
+        f"item {i}": {"quantity": str(random.randint(1, 20)), "unit": random.choice(UNITS)}
+        for i in range(max(size // 10, 1))
+    }
+
+
+def bench(dumps, loads, payload, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        data = dumps(payload)
+        loads(data)
+    elapsed = (time.perf_counter() - started) / repeat
+    return elapsed, len(data)
+
+
+CODECS = {
+    "json indent=4": (lambda o: json.dumps(o, indent=4), json.loads),
+    "json compact": (lambda o: json.dumps(o, separators=(",", ":")), json.loads),
+    f"serialization ({serialization.BACKEND})": (serialization.dumps, serialization.loads),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 1000, 10000, 100000], help="Pantry sizes")
+    args = parser.parse_args()
+    random.seed(0)
+
+    print(f"{'payload':<28}{'codec':<26}{'round trip':>14}{'bytes':>12}")
+    cases = [("recipe", recipe_payload())]
+    for size in args.sizes:
+        cases.append((f"inventory ({size} items)", inventory_payload(size)))
+        cases.append((f"shopping list ({max(size // 10, 1)})", shopping_payload(size)))
+    for name, payload in cases:
+        repeat = max(10, 200000 // (len(json.dumps(payload)) // 50 + 1))
+        for codec, (dumps, loads) in CODECS.items():
+            elapsed, size = bench(dumps, loads, payload, repeat)
+            print(f"{name:<28}{codec:<26}{elapsed * 1e6:>11.1f} us{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
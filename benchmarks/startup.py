@@ -0,0 +1,41 @@
+"""
+Measures time-to-first-prompt of the Foodie CLI on a cold interpreter.
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_to_prompt() -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "foodie_agent.py", "--exit-at-prompt"],
+        cwd=ROOT,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="Fail when the median exceeds this many seconds")
+    args = parser.parse_args()
+
+    samples = [time_to_prompt() for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"time-to-first-prompt over {args.runs} runs: min {min(samples):.3f}s  median {median:.3f}s  max {max(samples):.3f}s")
+    if median > args.budget:
+        sys.exit(f"median {median:.3f}s is over the {args.budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,275 @@
+import argparse
 import os
-import time
-from langgraph.checkpoint.sqlite import SqliteSaver
-from langchain_core.runnables.graph_mermaid import draw_mermaid_png
-from judgeval.common.tracer import Tracer
-from judgeval.integrations.langgraph import JudgevalCallbackHandler
-from src.graph import workflow
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt
-from rich.spinner import Spinner
-from rich.text import Text
 
 load_dotenv()
 
-# ----------------- Let's Judge -------------
-print(os.getenv("PROJECT_NAME"))
-judgment = Tracer(project_name=os.getenv("PROJECT_NAME"))
-handler = JudgevalCallbackHandler(judgment)
+
+def positive_int(text: str) -> int:
+    """argparse type for counts such as --servings: an integer >= 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def prepare():
+    """
+    Imports the heavy modules, builds the clients and compiles the graph.
+    Runs in a background thread while the user is answering the prompts.
+    """
+    from src.checkpoints import get_checkpoint_store
+    from src.config import LLM_TIERS, get_llm
+    from src.graph import workflow
+    from src.search import get_search
+    from src.tracing import get_exporter
+
+    for tier in LLM_TIERS:
+        get_llm(tier)
+    get_search()
+    # Builds the trace sink (Judgeval client or trace file) here rather than on the first run.
+    get_exporter()
+    return workflow.compile(checkpointer=get_checkpoint_store().saver)
+
+
+def stream_run(app, initial_state, config, console):
+    """Runs the graph in streaming mode, rendering node progress and partial recipe output as it arrives."""
+    from rich.live import Live
+    from src.live_view import LiveRecipeView
+
+    view = LiveRecipeView()
+    config = {**config, "configurable": {**config["configurable"], "render": False}}
+    with Live(view, console=console, refresh_per_second=12):
+        for mode, chunk in app.stream(initial_state, config=config, stream_mode=["updates", "messages"], durability="sync"):
+            view.feed(mode, chunk)
+    return view.result
+
+def print_profile(console, run):
+    """Per-run breakdown for --profile: node wall time, LLM tokens, store payload bytes and cache hits."""
+    from rich.table import Table
+
+    table = Table(title=f"⏱  Run profile ({run.wall:.2f}s wall)")
+    table.add_column("Node", style="cyan")
+    table.add_column("Wall time", style="magenta", justify="right")
+    table.add_column("Share", style="green", justify="right")
+    for node, seconds in sorted(run.nodes.items(), key=lambda item: -item[1]):
+        table.add_row(node, f"{seconds * 1000:.1f} ms", f"{seconds / run.wall * 100:.0f}%" if run.wall else "")
+    console.print(table)
+    console.print(f"  [bold]LLM tokens:[/bold] {run.tokens.get('prompt', 0)} prompt / {run.tokens.get('completion', 0)} completion")
+    for kind, payload in run.payload.items():
+        console.print(f"  [bold]{kind} payload:[/bold] {payload['read']} bytes read / {payload['written']} bytes written")
+    for name, value in sorted(run.counters.items()):
+        console.print(f"  [bold]{name}:[/bold] {value}")
+
+def run_headless(args):
+    """
+    Non-interactive run for --output json/ndjson: no prompts and no rich. The printer node
+    writes the result to stdout; --profile writes the run's metrics to stderr as JSON.
+    """
+    from src import metrics
+    from src.checkpoints import get_checkpoint_store, new_thread_id
+    from src.serialization import dumps
+    from src.tracing import callbacks
+
+    app = prepare()
+    thread_id = new_thread_id()
+    sys.stderr.write(f"run id: {thread_id}\n")
+    config = {"configurable": {"thread_id": thread_id, "output": args.output}, "callbacks": callbacks(thread_id)}
+    with metrics.run(thread_id) as run, get_checkpoint_store().track(thread_id, args.dish, args.servings):
+        app.invoke({"dish": args.dish, "servings": args.servings}, config=config, durability="sync")
+    if args.profile:
+        sys.stderr.write(dumps(run.to_dict()) + "\n")
+
+
+def resume(args):
+    """
+    Continues a failed or interrupted run (default: the most recent one) from its last
+    completed node; the search, LLM and inventory work already checkpointed isn't repeated.
+    """
+    from src import metrics
+    from src.checkpoints import get_checkpoint_store
+    from src.tracing import callbacks
+
+    store = get_checkpoint_store()
+    thread_id = args.thread_id
+    if thread_id is None:
+        candidates = store.runs("failed", limit=1) or store.runs("running", limit=1)
+        if not candidates:
+            sys.exit("No failed run to resume.")
+        thread_id = candidates[0]["thread_id"]
+
+    app = prepare()
+    config = {"configurable": {"thread_id": thread_id, "output": args.output}, "callbacks": callbacks(thread_id)}
+    snapshot = app.get_state(config)
+    if not snapshot.values:
+        sys.exit(f"No checkpoints for run {thread_id!r}.")
+    if not snapshot.next:
+        sys.stderr.write(f"Run {thread_id} already finished.\n")
+        return
+    sys.stderr.write(f"Resuming run {thread_id} at {', '.join(snapshot.next)}\n")
+    with metrics.run(thread_id), store.track(thread_id):
+        app.invoke(None, config=config, durability="sync")
+
+
+def list_runs(args):
+    """Prints recent runs with their status, as a table or as JSON."""
+    from src.checkpoints import get_checkpoint_store
+
+    runs = get_checkpoint_store().runs(limit=args.limit)
+    if args.output != "rich":
+        from src.output import ResultWriter
+        with ResultWriter(sys.stdout.buffer, args.output) as writer:
+            for run in runs:
+                writer.write(run)
+        return
+    import time
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Recent runs")
+    for column in ("Run id", "Dish", "Servings", "Status", "Updated", "Error"):
+        table.add_column(column)
+    for run in runs:
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["updated_at"]))
+        table.add_row(run["thread_id"], run["dish"] or "", str(run["servings"] or ""), run["status"], updated, run["error"] or "")
+    Console().print(table)
+
+
+def prune(args):
+    from src.checkpoints import get_checkpoint_store
+    from src.config import CHECKPOINT_MAX_RUNS, CHECKPOINT_RETENTION_DAYS
+
+    pruned = get_checkpoint_store().prune(CHECKPOINT_RETENTION_DAYS * 86400, CHECKPOINT_MAX_RUNS)
+    print(f"Pruned {pruned} runs older than {CHECKPOINT_RETENTION_DAYS:g} days or beyond the newest {CHECKPOINT_MAX_RUNS}.")
+
+
+def cook_now(args):
+    """
+    Ranks the dishes in the local recipe library by how much of each the inventory covers.
+    Runs entirely offline: no search, no LLM. --dish narrows the candidates by full-text search.
+    """
+    from src.inventory_store import get_inventory_store
+    from src.recipe_library import get_recipe_library
+
+    results = get_recipe_library().cook_now(get_inventory_store().load(), args.limit, args.servings, args.dish)
+    if args.output != "rich":
+        from src.output import ResultWriter
+        with ResultWriter(sys.stdout.buffer, args.output) as writer:
+            for result in results:
+                writer.write(result)
+        return
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=f"What can I cook now? ({args.servings} servings)")
+    table.add_column("Dish", style="cyan")
+    table.add_column("Coverage", style="green", justify="right")
+    table.add_column("Missing cost", style="magenta", justify="right")
+    table.add_column("Missing")
+    for result in results:
+        table.add_row(result["name"], f"{result['coverage']:.0%}", f"{result['missing_cost']:.2f}", ", ".join(result["missing"]))
+    Console().print(table)
+
 
 def main():
     """ The Main Function that initialize and Invokes the Graph """
+    from src.config import OUTPUT_FORMAT
+    from src.output import FORMATS
+
+    parser = argparse.ArgumentParser(description="Foodie AI Assistant")
+    parser.add_argument("command", nargs="?", default="cook", choices=["cook", "resume", "runs", "prune", "cook-now"],
+                        help="cook (default); resume a failed run; list recent runs; prune old checkpoints; "
+                             "rank library dishes by what's in stock")
+    parser.add_argument("thread_id", nargs="?", help="Run id to resume (default: the most recent failed run)")
+    parser.add_argument("--stream", action="store_true", help="Render progress and the recipe as it is generated")
+    parser.add_argument("--profile", action="store_true", help="Print a per-node timing, token and store payload breakdown")
+    parser.add_argument("--output", choices=FORMATS, default=OUTPUT_FORMAT, help="rich tables, or the result as JSON/NDJSON on stdout")
+    parser.add_argument("--dish", help="Dish to cook (required with --output json/ndjson); a search filter for cook-now")
+    parser.add_argument("--servings", type=positive_int, default=2)
+    parser.add_argument("--limit", type=positive_int, default=20, help="Runs listed by runs, or dishes ranked by cook-now")
+    parser.add_argument("--exit-at-prompt", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command == "resume":
+        return resume(args)
+    if args.command == "runs":
+        return list_runs(args)
+    if args.command == "prune":
+        return prune(args)
+    if args.command == "cook-now":
+        return cook_now(args)
+    if args.output != "rich":
+        if not args.dish:
+            parser.error("--dish is required with --output json/ndjson")
+        return run_headless(args)
+
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.prompt import IntPrompt, Prompt
+    from rich.text import Text
+
     console = Console()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+    ready = executor.submit(prepare)
 
     console.print(Panel(Text("Welcome to Foodie!", justify="center", style="bold green"), title="[bold]Foodie AI Assistant[/bold]", border_style="green"))
 
-    with console.status("[bold green]Warming up the kitchen...", spinner="dots") as status:
-        time.sleep(2)
-        status.update(spinner="bouncingBar", status="[bold cyan]Checking the pantry...")
-        time.sleep(2)
-        status.update(spinner="clock", status="[bold yellow]Sharpening the knives...")
-        time.sleep(2)
+    if args.exit_at_prompt:
+        # Used by benchmarks/startup.py to measure time-to-first-prompt.
+        os._exit(0)
 
-    dish = Prompt.ask("[bold cyan]What dish would you like to cook today? :fork_and_knife:")
-    servings = Prompt.ask("[bold cyan]How many servings? :shallow_pan_of_food:")
+    dish = args.dish or Prompt.ask("[bold cyan]What dish would you like to cook today? :fork_and_knife:")
+    servings = args.servings if args.dish else None
+    while servings is None:
+        servings = IntPrompt.ask("[bold cyan]How many servings? :shallow_pan_of_food:")
+        if servings < 1:
+            console.print("[prompt.invalid]Please enter at least 1 serving")
+            servings = None
 
-    config = {"configurable": {"thread_id": "1"}, "callbacks": [handler]}
-    with SqliteSaver.from_conn_string(":memory:") as memory:
-        app = workflow.compile(checkpointer=memory)
+    if not ready.done():
+        with console.status("[bold green]Warming up the kitchen...", spinner="dots"):
+            app = ready.result()
+    else:
+        app = ready.result()
 
-        initial_state = {
-            "messages": [f"Prepare a recipe for {dish}."],
-            "servings": servings
-        }
+    from src import metrics
+    from src.checkpoints import get_checkpoint_store, new_thread_id
+    from src.tracing import callbacks
+    thread_id = new_thread_id()
+    config = {"configurable": {"thread_id": thread_id, "output": "rich"}, "callbacks": callbacks(thread_id)}
+    initial_state = {
+        "dish": dish,
+        "servings": servings
+    }
 
-        with console.status("[bold green]Cooking up your recipe...", spinner="earth"):
-            final_state = app.invoke(initial_state, config=config)
+    try:
+        with metrics.run(thread_id) as run, get_checkpoint_store().track(thread_id, dish, servings):
+            if args.stream:
+                stream_run(app, initial_state, config, console)
+            else:
+                with console.status("[bold green]Cooking up your recipe...", spinner="earth"):
+                    app.invoke(initial_state, config=config, durability="sync")
+    except Exception as e:
+        console.print(f"[bold red]Run {thread_id} failed:[/bold red] {type(e).__name__}: {e}")
+        console.print(f"Completed steps are saved; continue with [bold]python foodie_agent.py resume {thread_id}[/bold]")
+        sys.exit(1)
 
+    from src.recipe_cache import get_recipe_cache
     console.print("\n[bold green]Execution Details:[/bold green]")
-    console.print(f"  [bold]Executed Nodes:[/bold] {handler.executed_nodes}")
+    console.print(f"  [bold]Run id:[/bold] {thread_id}")
+    console.print(f"  [bold]Executed Nodes:[/bold] {list(run.nodes)}")
+    stats = get_recipe_cache().stats()
+    console.print(
+        f"  [bold]Recipe Cache:[/bold] {stats['total_hits']} hits / {stats['total_misses']} misses "
+        f"({stats['entries']} dishes cached)"
+    )
+    if args.profile:
+        print_profile(console, run)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+import argparse
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from src import metrics, tracing
+from src.checkpoints import CheckpointStore
+from src.config import (
+    CHECKPOINT_MAX_RUNS, CHECKPOINT_RETENTION_DAYS, METRICS_PORT, SERVICE_CHECKPOINTS, SERVICE_MAX_CONCURRENCY,
+    SERVICE_QUEUE_TIMEOUT, LLM_TIERS, get_llm,
+)
+from src.graph import workflow
+from src.inventory_store import get_inventory_store
+from src.recipe_library import get_recipe_library
+from src.results import extract_result
+from src.search import get_search
+from src.serialization import dumpb, loads
+from src.shopping_ledger import get_shopping_ledger
+
+load_dotenv()
+
+
+def positive_int(value, field: str) -> int:
+    """`value` if it is a JSON integer >= 1; raises ValueError otherwise (strings, floats, booleans)."""
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"\"{field}\" must be a positive integer")
+    return value
+
+
+class FoodieService:
+    """
+    Compiles the workflow once and serves requests against it. All sessions
+    share one on-disk checkpointer; each request runs under its own session id
+    (the LangGraph thread id), and at most `max_concurrency` graph runs are
+    in flight while the rest wait in line. Failed sessions can be resumed
+    from their last completed node.
+    """
+
+    def __init__(self, checkpoints: str, max_concurrency: int, queue_timeout: float):
+        for tier in LLM_TIERS:
+            get_llm(tier)
+        get_search()
+        tracing.get_exporter()
+        self.store = CheckpointStore(checkpoints)
+        self.store.prune(CHECKPOINT_RETENTION_DAYS * 86400, CHECKPOINT_MAX_RUNS)
+        self.app = workflow.compile(checkpointer=self.store.saver)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def cook(self, dish: str, servings, session_id: str = None) -> dict:
+        session_id = session_id or uuid.uuid4().hex
+        initial_state = {"dish": dish, "servings": servings}
+        final_state, elapsed = self._run(session_id, initial_state, dish, servings)
+        return {"session_id": session_id, "dish": dish, "servings": servings, "elapsed": elapsed, **extract_result(final_state)}
+
+    def resume(self, session_id: str):
+        """Continues a failed session from its last completed node; None if there is nothing to resume."""
+        snapshot = self.app.get_state({"configurable": {"thread_id": session_id}})
+        if not snapshot.values or not snapshot.next:
+            return None
+        final_state, elapsed = self._run(session_id, None)
+        return {"session_id": session_id, "elapsed": elapsed, **extract_result(final_state)}
+
+    def _run(self, session_id: str, initial_state, dish: str = None, servings=None):
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise TimeoutError("Service is saturated, try again shortly")
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            config = {"configurable": {"thread_id": session_id, "render": False}, "callbacks": tracing.callbacks(session_id)}
+            with metrics.run(session_id), self.store.track(session_id, dish, servings):
+                final_state = self.app.invoke(initial_state, config=config, durability="sync")
+        finally:
+            self.slots.release()
+            with self._lock:
+                self.in_flight -= 1
+                self.served += 1
+        return final_state, round(time.perf_counter() - started, 3)
+
+    def session(self, session_id: str):
+        snapshot = self.app.get_state({"configurable": {"thread_id": session_id}})
+        if not snapshot.values:
+            return None
+        run = self.store.run(session_id) or {}
+        return {
+            "session_id": session_id,
+            "status": run.get("status"),
+            "error": run.get("error"),
+            "next": list(snapshot.next),
+            **extract_result(snapshot.values),
+        }
+
+    def health(self) -> dict:
+        return {"status": "ok", "in_flight": self.in_flight, "served": self.served}
+
+
+def make_handler(service: FoodieService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            body = dumpb(payload)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> dict:
+            """The request's JSON object; raises ValueError for invalid JSON or any other JSON value."""
+            length = int(self.headers.get("Content-Length", 0))
+            request = loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("expected a JSON object")
+            return request
+
+        def do_GET(self):
+            if self.path == "/health":
+                return self._send(200, service.health())
+            if self.path == "/metrics":
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                return self.wfile.write(body)
+            if self.path == "/shopping-list":
+                return self._send(200, get_shopping_ledger().items())
+            if self.path.startswith("/sessions/"):
+                result = service.session(self.path[len("/sessions/"):])
+                return self._send(200, result) if result else self._send(404, {"error": "unknown session"})
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path.startswith("/sessions/") and self.path.endswith("/resume"):
+                try:
+                    result = service.resume(self.path[len("/sessions/"):-len("/resume")])
+                except TimeoutError as e:
+                    return self._send(503, {"error": str(e)})
+                except Exception as e:
+                    return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                return self._send(200, result) if result else self._send(404, {"error": "nothing to resume"})
+            if self.path == "/shopping-list/purchased":
+                try:
+                    request = self._body()
+                except ValueError:
+                    return self._send(400, {"error": "expected a JSON object"})
+                names = request.get("items")
+                if names is not None and not (isinstance(names, list) and all(isinstance(n, str) for n in names)):
+                    return self._send(400, {"error": "\"items\" must be a list of item names"})
+                return self._send(200, get_shopping_ledger().mark_purchased(names))
+            if self.path == "/cook-now":
+                try:
+                    request = self._body()
+                    servings = positive_int(request.get("servings", 2), "servings")
+                    limit = positive_int(request.get("limit", 10), "limit")
+                except ValueError as e:
+                    return self._send(400, {"error": str(e)})
+                inventory = get_inventory_store().load()
+                dishes = get_recipe_library().cook_now(inventory, limit, servings, request.get("query"))
+                return self._send(200, {"dishes": dishes})
+            if self.path != "/recipes":
+                return self._send(404, {"error": "not found"})
+            try:
+                request = self._body()
+                dish = request["dish"]
+            except (ValueError, KeyError):
+                return self._send(400, {"error": "expected a JSON object with a \"dish\" field"})
+            try:
+                servings = positive_int(request.get("servings", 2), "servings")
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            try:
+                result = service.cook(dish, servings, request.get("session_id"))
+            except TimeoutError as e:
+                return self._send(503, {"error": str(e)})
+            except Exception as e:
+                return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            self._send(200, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Foodie as a long-running HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT, args.host)
+    service = FoodieService(SERVICE_CHECKPOINTS, SERVICE_MAX_CONCURRENCY, SERVICE_QUEUE_TIMEOUT)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Foodie service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+from dotenv import load_dotenv
+from src import metrics
+from src.meal_plan import plan_meals
+from src.serialization import dump_file, loads
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan several dishes at once against a single inventory commit.")
+    parser.add_argument("plan", help="JSONL file with one {\"dish\": ..., \"servings\": ...} per line")
+    parser.add_argument("-o", "--output", help="Write the plan as JSON instead of printing tables")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Recipes fetched in parallel")
+    args = parser.parse_args()
+
+    with open(args.plan, "rb") as f:
+        requests = [loads(line) for line in f if line.strip()]
+
+    with metrics.run() as run:
+        plan = plan_meals(requests, args.concurrency)
+
+    if args.output:
+        dump_file(plan, args.output)
+        return
+
+    from rich.console import Console
+    from src.render import ingredients_table, inventory_delta_table, shopping_list_table
+
+    console = Console()
+    for dish in plan["dishes"]:
+        console.print(f"\n[bold cyan]{dish['dish'].title()}[/bold cyan] ({dish['servings']} servings)")
+        console.print(ingredients_table(dish["scaled_recipe"].get("ingredients", {})))
+    if plan["missing_list"]:
+        console.print(shopping_list_table(plan["missing_list"]))
+    if plan["inventory_delta"]:
+        console.print(inventory_delta_table(plan["inventory_delta"]))
+    console.print(f"[bold green]✅ Planned {len(plan['dishes'])} dishes in {run.wall:.1f}s.[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Durable LangGraph checkpoints on disk. Every run gets its own thread id and a
+row in the `runs` table, so a run that failed part-way (an LLM error after the
+search, a crash) can be resumed from its last completed node with
+`app.invoke(None, config)`. Old runs are pruned by age and count.
+"""
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+def new_thread_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class CheckpointStore:
+    """A SqliteSaver plus a `runs` table tracking each thread's request and status."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.saver = SqliteSaver(self.conn)
+        with self.saver.cursor() as cur:
+            # Shares the saver's connection and lock, so run bookkeeping never interleaves with its writes.
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "thread_id TEXT PRIMARY KEY, dish TEXT, servings INTEGER, status TEXT NOT NULL, "
+                "error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _set(self, thread_id: str, status: str, error: str = None):
+        with self.saver.cursor() as cur:
+            cur.execute(
+                "UPDATE runs SET status = ?, error = ?, updated_at = ? WHERE thread_id = ?",
+                (status, error, time.time(), thread_id),
+            )
+
+    @contextmanager
+    def track(self, thread_id: str, dish: str = None, servings=None):
+        """
+        Records the run as running for the duration of the block, then done or failed.
+        Pass the request to register a new run; omit it when resuming an existing one.
+        """
+        now = time.time()
+        with self.saver.cursor() as cur:
+            if dish is not None:
+                cur.execute(
+                    "INSERT OR REPLACE INTO runs(thread_id, dish, servings, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'running', ?, ?)",
+                    (thread_id, dish, int(servings or 2), now, now),
+                )
+            else:
+                cur.execute("UPDATE runs SET status = 'running', updated_at = ? WHERE thread_id = ?", (now, thread_id))
+        try:
+            yield
+        except BaseException as e:
+            self._set(thread_id, "failed", f"{type(e).__name__}: {e}")
+            raise
+        self._set(thread_id, "done")
+
+    def run(self, thread_id: str):
+        with self.saver.cursor(transaction=False) as cur:
+            row = cur.execute(
+                "SELECT thread_id, dish, servings, status, error, created_at, updated_at FROM runs WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        return self._as_dict(row) if row else None
+
+    def runs(self, status: str = None, limit: int = 20) -> list:
+        """Most recent runs first, optionally only those with `status`."""
+        query = "SELECT thread_id, dish, servings, status, error, created_at, updated_at FROM runs"
+        params = ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        with self.saver.cursor(transaction=False) as cur:
+            rows = cur.execute(query + " ORDER BY updated_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    @staticmethod
+    def _as_dict(row) -> dict:
+        keys = ("thread_id", "dish", "servings", "status", "error", "created_at", "updated_at")
+        return dict(zip(keys, row))
+
+    def prune(self, max_age: float, max_runs: int) -> int:
+        """
+        Deletes the checkpoints of runs last updated more than `max_age` seconds ago, and of all
+        but the newest `max_runs` runs; recent runs still in progress are kept. Returns the number pruned.
+        """
+        cutoff = time.time() - max_age
+        with self.saver.cursor(transaction=False) as cur:
+            rows = cur.execute(
+                "SELECT thread_id FROM runs WHERE updated_at < ? OR (status != 'running' AND thread_id NOT IN "
+                "(SELECT thread_id FROM runs ORDER BY updated_at DESC LIMIT ?))",
+                (cutoff, max_runs),
+            ).fetchall()
+        for (thread_id,) in rows:
+            self.saver.delete_thread(thread_id)
+        with self.saver.cursor() as cur:
+            cur.executemany("DELETE FROM runs WHERE thread_id = ?", rows)
+        return len(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Returns the process wide store at FOODIE_CHECKPOINTS, pruned by the retention policy when first opened."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from src.config import CHECKPOINTS_DB, CHECKPOINT_MAX_RUNS, CHECKPOINT_RETENTION_DAYS
+            _store = CheckpointStore(CHECKPOINTS_DB)
+            _store.prune(CHECKPOINT_RETENTION_DAYS * 86400, CHECKPOINT_MAX_RUNS)
+    return _store
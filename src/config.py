@@ -1,9 +1,102 @@
 import os
-from langchain_groq import ChatGroq
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-llm = ChatGroq(temperature=0.8, model_name="llama3-70b-8192", api_key=GROQ_API_KEY)
+RECIPE_CACHE_PATH = os.getenv("FOODIE_RECIPE_CACHE", "recipe_cache.db")
+RECIPE_CACHE_TTL = int(os.getenv("FOODIE_RECIPE_CACHE_TTL", str(7 * 24 * 3600)))
+RECIPE_CACHE_MAX_ENTRIES = int(os.getenv("FOODIE_RECIPE_CACHE_MAX_ENTRIES", "500"))
+RECIPE_LIBRARY_PATH = os.getenv("FOODIE_RECIPE_LIBRARY", "recipe_library.db")
+
+INVENTORY_DB = os.getenv("FOODIE_INVENTORY_DB", "inventory.db")
+INVENTORY_JSON = os.getenv("FOODIE_INVENTORY_JSON", "inventory.json")
+INVENTORY_COMPACT_EVERY = int(os.getenv("FOODIE_INVENTORY_COMPACT_EVERY", "50"))
+SHOPPING_LIST_DB = os.getenv("FOODIE_SHOPPING_LIST_DB", "shopping_list.db")
+SHOPPING_LIST_JSON = os.getenv("FOODIE_SHOPPING_LIST_JSON", "shopping_list.json")
+SHOPPING_LIST_COMPACT_EVERY = int(os.getenv("FOODIE_SHOPPING_LIST_COMPACT_EVERY", "50"))
+INGREDIENT_ALIASES = os.getenv("FOODIE_INGREDIENT_ALIASES", "ingredient_aliases.json")
+NAME_MATCH_THRESHOLD = float(os.getenv("FOODIE_NAME_MATCH_THRESHOLD", "0.75"))
+
+SEARCH_PROVIDER = os.getenv("FOODIE_SEARCH_PROVIDER", "duckduckgo")
+SEARCH_FIXTURES = os.getenv("FOODIE_SEARCH_FIXTURES", "fixtures/search.json")
+SEARCH_CACHE_SIZE = int(os.getenv("FOODIE_SEARCH_CACHE_SIZE", "256"))
+# Disk tier of the search cache; it keeps a run's search for `resume` in a new process ("" disables)
+SEARCH_CACHE_PATH = os.getenv("FOODIE_SEARCH_CACHE", "search_cache.db")
+SEARCH_CACHE_TTL = int(os.getenv("FOODIE_SEARCH_CACHE_TTL", str(24 * 3600)))
+SEARCH_TIMEOUT = float(os.getenv("FOODIE_SEARCH_TIMEOUT", "10"))
+SEARCH_RETRIES = int(os.getenv("FOODIE_SEARCH_RETRIES", "2"))
+SEARCH_BACKOFF = float(os.getenv("FOODIE_SEARCH_BACKOFF", "0.5"))
+SEARCH_RPM = int(os.getenv("FOODIE_SEARCH_RPM", "0"))
+SEARCH_TOKEN_BUDGET = int(os.getenv("FOODIE_SEARCH_TOKEN_BUDGET", "400"))
+LLM_RECORDINGS = os.getenv("FOODIE_RECORD_LLM", "")
+
+# Model tiers, tried in order of LLM_TIERS; a tier's answer is kept if it validates
+LLM_MODELS = {
+    "fast": os.getenv("FOODIE_LLM_FAST_MODEL", "llama3-8b-8192"),
+    "large": os.getenv("FOODIE_LLM_MODEL", "llama3-70b-8192"),
+}
+# An empty FOODIE_LLM_TIERS means the large model only
+LLM_TIERS = [tier.strip() for tier in os.getenv("FOODIE_LLM_TIERS", "fast,large").split(",") if tier.strip()] or ["large"]
+if set(LLM_TIERS) - set(LLM_MODELS):
+    raise ValueError(f"FOODIE_LLM_TIERS: unknown tiers {sorted(set(LLM_TIERS) - set(LLM_MODELS))}; choose from {sorted(LLM_MODELS)}")
+LLM_TEMPERATURE = float(os.getenv("FOODIE_LLM_TEMPERATURE", "0"))
+# Client-side pacing per model tier (Groq free-tier limits by default; 0 disables)
+LLM_RPM = int(os.getenv("FOODIE_LLM_RPM", "30"))
+LLM_TPM = int(os.getenv("FOODIE_LLM_TPM", "6000"))
+LLM_COMPLETION_TOKENS = int(os.getenv("FOODIE_LLM_COMPLETION_TOKENS", "600"))
+
+OUTPUT_FORMAT = os.getenv("FOODIE_OUTPUT_FORMAT", "rich")
+
+METRICS_FILE = os.getenv("FOODIE_METRICS_FILE", "metrics.jsonl")
+METRICS_PORT = int(os.getenv("FOODIE_METRICS_PORT", "0"))
+
+# Tracing: "judgeval" (default when JUDGMENT_API_KEY is set), "file" or "off"
+TRACE_MODE = os.getenv("FOODIE_TRACE", "judgeval" if os.getenv("JUDGMENT_API_KEY") else "off")
+TRACE_SAMPLE_RATE = float(os.getenv("FOODIE_TRACE_SAMPLE_RATE", "1.0"))
+TRACE_FILE = os.getenv("FOODIE_TRACE_FILE", "traces.jsonl")
+TRACE_QUEUE_SIZE = int(os.getenv("FOODIE_TRACE_QUEUE_SIZE", "1000"))
+TRACE_BATCH_SIZE = int(os.getenv("FOODIE_TRACE_BATCH_SIZE", "50"))
+TRACE_FLUSH_SECONDS = float(os.getenv("FOODIE_TRACE_FLUSH_SECONDS", "2"))
+
+CHECKPOINTS_DB = os.getenv("FOODIE_CHECKPOINTS", "checkpoints.db")
+CHECKPOINT_RETENTION_DAYS = float(os.getenv("FOODIE_CHECKPOINT_RETENTION_DAYS", "7"))
+CHECKPOINT_MAX_RUNS = int(os.getenv("FOODIE_CHECKPOINT_MAX_RUNS", "200"))
+NODE_MAX_ATTEMPTS = int(os.getenv("FOODIE_NODE_MAX_ATTEMPTS", "3"))
+
+SERVICE_CHECKPOINTS = os.getenv("FOODIE_SERVICE_CHECKPOINTS", CHECKPOINTS_DB)
+SERVICE_MAX_CONCURRENCY = int(os.getenv("FOODIE_SERVICE_MAX_CONCURRENCY", "16"))
+SERVICE_QUEUE_TIMEOUT = float(os.getenv("FOODIE_SERVICE_QUEUE_TIMEOUT", "60"))
+
+_llms = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm(tier: str = "large"):
+    """Builds the Groq chat client for a model tier on first use; langchain_groq is only imported then."""
+    with _llm_lock:
+        if tier not in _llms:
+            from langchain_groq import ChatGroq
+            llm = ChatGroq(temperature=LLM_TEMPERATURE, model_name=LLM_MODELS[tier], api_key=GROQ_API_KEY)
+            if LLM_RECORDINGS:
+                from src.replay import RecordingLLM
+                recorder = next((other for other in _llms.values() if isinstance(other, RecordingLLM)), None)
+                llm = recorder.share(llm) if recorder else RecordingLLM(llm, LLM_RECORDINGS)
+            _llms[tier] = llm
+    return _llms[tier]
+
+
+def set_llm(llm, tier: str = None):
+    """Replaces the chat client for one tier, or for every tier when `tier` is None (e.g. a replay stand-in)."""
+    with _llm_lock:
+        for name in [tier] if tier else LLM_MODELS:
+            _llms[name] = llm
+
+
+def __getattr__(name):
+    # Keeps `from src.config import llm` working without constructing the client at import time.
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,93 @@
+"""
+Distills raw search results before they go into the recipe prompt: the text
+is split into passages, each passage is scored locally for recipe relevance,
+near-duplicates are dropped and the best passages are kept within a token
+budget, in their original order.
+"""
+import math
+import re
+from src.name_index import singularize
+from src.units import UNIT_ALIASES, UNITS
+
+_WORD = re.compile(r"[a-z0-9']+")
+# Sentence ends, line breaks and the "..." DuckDuckGo puts between snippets
+_BOUNDARY = re.compile(r"\s*(?:\.{3}|…|\n+|(?<=[.!?])\s+(?=[A-Z0-9]))\s*")
+_UNIT_WORDS = sorted(
+    {*UNITS, *UNIT_ALIASES, *UNIT_ALIASES.values(), "large", "small", "handful", "sprig", "slice", "slices"},
+    key=len,
+    reverse=True,
+)
+_QUANTITY = re.compile(
+    r"\b\d+(?:[./]\d+)?\s*(?:" + "|".join(re.escape(unit) for unit in _UNIT_WORDS if unit) + r")\b",
+    re.IGNORECASE,
+)
+INSTRUCTION_VERBS = {
+    "add", "bake", "beat", "blanch", "blend", "boil", "chop", "combine", "cook", "cover", "dice", "drain",
+    "fold", "fry", "garnish", "grate", "grill", "heat", "knead", "marinate", "melt", "mix", "pour", "preheat",
+    "puree", "roast", "saute", "season", "serve", "simmer", "slice", "soak", "spread", "sprinkle", "stir",
+    "temper", "toss", "whisk",
+}
+_RECIPE_WORDS = {"ingredient", "instruction", "method", "step", "serve", "serving", "minute", "recipe"}
+_BOILERPLATE = re.compile(r"https?://|www\.|cookie|subscribe|newsletter|privacy|sign up|advertis|©", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Llama-family tokenizers (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def split_passages(text: str) -> list:
+    return [passage for passage in _BOUNDARY.split(str(text or "")) if passage and passage.strip(" .")]
+
+
+def _words(text: str) -> list:
+    return [singularize(word) for word in _WORD.findall(text.lower())]
+
+
+def score_passage(passage: str, dish_words: set) -> float:
+    """Recipe relevance: quantity patterns, instruction verbs and dish words, normalized for length."""
+    words = _words(passage)
+    if not words:
+        return 0.0
+    quantities = len(_QUANTITY.findall(passage))
+    verbs = sum(word in INSTRUCTION_VERBS for word in words)
+    recipe_words = sum(word in _RECIPE_WORDS for word in words)
+    dish = sum(word in dish_words for word in words)
+    score = 2.0 * quantities + verbs + recipe_words + 1.5 * min(dish, 3)
+    if _BOILERPLATE.search(passage):
+        score -= 3.0
+    return max(score, 0.0) / math.sqrt(len(words))
+
+
+def _similar(a: set, b: set, threshold: float = 0.8) -> bool:
+    return bool(a) and bool(b) and len(a & b) / len(a | b) >= threshold
+
+
+def distill(text: str, dish: str, budget: int) -> str:
+    """
+    Keeps the most recipe-like, non-duplicate passages of `text` that fit in `budget` tokens.
+    A budget of 0 returns the text unchanged.
+    """
+    if not budget or not text:
+        return text
+    dish_words = set(_words(dish)) - {"recipe", "for"}
+    passages = []
+    for position, passage in enumerate(split_passages(text)):
+        words = _words(passage)
+        shingles = set(zip(*(words[i:] for i in range(3)))) or {tuple(words)}
+        if any(_similar(shingles, other[3]) for other in passages):
+            continue
+        passages.append((position, passage, score_passage(passage, dish_words), shingles))
+
+    relevant = [p for p in passages if p[2] > 0] or passages
+    kept, used = [], 0
+    for position, passage, _, _ in sorted(relevant, key=lambda p: -p[2]):
+        cost = estimate_tokens(passage) + 1
+        if used + cost > budget:
+            continue
+        kept.append((position, passage))
+        used += cost
+    if not kept and relevant:
+        # A single passage larger than the whole budget: keep its head.
+        return max(relevant, key=lambda p: p[2])[1][: budget * 4]
+    return " ".join(passage for _, passage in sorted(kept))
@@ -1,40 +1,65 @@
-import json
-from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import RetryPolicy
+from src.config import NODE_MAX_ATTEMPTS
 from src.state import AgentState
+from src.metrics import instrument
+from src.search import SearchError
 from src.nodes import (
     recipe_fetcher,
+    arecipe_fetcher,
     inventory_fetcher,
+    ainventory_fetcher,
     recipe_scaler,
     inventory_manager,
     shopping_list,
     printer,
 )
 
+def node(name: str, func, afunc=None):
+    """Instrumented node; with `afunc`, `ainvoke`/`astream` use the async variant."""
+    if afunc is None:
+        return instrument(name, func)
+    return RunnableLambda(instrument(name, func), afunc=instrument(name, afunc), name=name)
+
 def inventory_branch(state: AgentState):
-    last_msg = state["messages"][-1]
-    try:
-        content = json.loads(last_msg.content)
-        missing = content.get("missing_list", {})
-        if missing:
-            return "shopping_list"
-    except Exception:
-        pass
+    if state.get("missing_list"):
+        return "shopping_list"
     return "printer"
 
+def transient(exc: Exception) -> bool:
+    """
+    Errors worth retrying a node for: failed searches, connection errors and timeouts, rate limits
+    (429) and server errors (5xx). Other provider errors, such as a 400 or 401, fail at once.
+    """
+    if isinstance(exc, (SearchError, ConnectionError, TimeoutError)):
+        return True
+    # groq.APIStatusError carries `status_code`; httpx and requests errors carry a response.
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or 500 <= status < 600
+    import groq
+    return isinstance(exc, groq.APIConnectionError)
+
 workflow = StateGraph(AgentState)
 
-workflow.add_node("recipe_fetcher", recipe_fetcher)
-workflow.add_node("inventory_fetcher", inventory_fetcher)
-workflow.add_node("recipe_scaler", recipe_scaler)
-workflow.add_node("inventory_manager", inventory_manager)
-workflow.add_node("shopping_list", shopping_list)
-workflow.add_node("printer", printer)
+# Transient errors (see `transient`) retry just the failing node; completed nodes are never
+# re-run, and the search is served from the search cache, which is kept on disk between processes.
+retry = RetryPolicy(max_attempts=NODE_MAX_ATTEMPTS, retry_on=transient)
 
-workflow.set_entry_point("recipe_fetcher")
+workflow.add_node("recipe_fetcher", node("recipe_fetcher", recipe_fetcher, arecipe_fetcher), retry_policy=retry)
+workflow.add_node("inventory_fetcher", node("inventory_fetcher", inventory_fetcher, ainventory_fetcher), retry_policy=retry)
+workflow.add_node("recipe_scaler", node("recipe_scaler", recipe_scaler))
+workflow.add_node("inventory_manager", node("inventory_manager", inventory_manager))
+workflow.add_node("shopping_list", node("shopping_list", shopping_list))
+workflow.add_node("printer", node("printer", printer))
 
-workflow.add_edge("recipe_fetcher", "inventory_fetcher")
-workflow.add_edge("inventory_fetcher", "recipe_scaler")
-workflow.add_edge("recipe_scaler", "inventory_manager")
+# The search + LLM branch and the inventory branch are independent and run in parallel;
+# inventory_manager waits for both before reconciling.
+workflow.add_edge(START, "recipe_fetcher")
+workflow.add_edge(START, "inventory_fetcher")
+workflow.add_edge("recipe_fetcher", "recipe_scaler")
+workflow.add_edge(["recipe_scaler", "inventory_fetcher"], "inventory_manager")
 workflow.add_conditional_edges(
     "inventory_manager",
     inventory_branch,
@@ -0,0 +1,317 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from src import metrics
+from src.serialization import dump_file, dumps, load_file, loads
+from src.units import convert, format_quantity, normalize_unit, parse_quantity
+
+
+def normalize_name(name: str) -> str:
+    """Index key for an ingredient: lowercase with collapsed whitespace."""
+    return " ".join(str(name).lower().split())
+
+
+def reconcile(items: dict, ingredients: dict, index=None):
+    """
+    Works out how much of each scaled ingredient is taken from `items`, the current stock as
+    `{normalized name: {"name", "quantity", "unit"}}` with numeric quantities and canonical units.
+    Ingredient names are resolved through the optional `NameIndex`.
+    Returns the inventory delta and the missing list. If an ingredient is insufficient it is
+    added to the missing list, but whatever is available is still used up. Ingredients that
+    resolve to the same item ("onion", "onions, sliced") draw on the same stock.
+    """
+    delta = {}
+    missing_list = {}
+    remaining = {}
+    for ingredient, data in ingredients.items():
+        unit = normalize_unit(data.get("unit", ""))
+        req_amt = parse_quantity(data.get("quantity"))
+        if req_amt is None:
+            continue
+
+        match = index.lookup(ingredient) if index is not None else ingredient
+        key = normalize_name(match) if match is not None else None
+        inv_item = items.get(key)
+        needed = None
+        if inv_item is not None:
+            inv_unit = normalize_unit(inv_item["unit"])
+            needed = convert(req_amt, unit, inv_unit, ingredient)
+        if needed is None:
+            # Not stocked, or stocked in a unit we cannot convert to (e.g. "cloves" vs "g").
+            missing_list[ingredient] = {"required": format_quantity(req_amt), "available": "0", "unit": unit}
+            continue
+
+        inv_amt = inv_item["quantity"]
+        if inv_amt is None:
+            inv_amt = needed
+        else:
+            inv_amt = remaining.get(key, inv_amt)
+        if inv_amt < needed:
+            missing_list[ingredient] = {
+                "required": format_quantity(req_amt),
+                "available": format_quantity(convert(inv_amt, inv_unit, unit, ingredient)),
+                "unit": unit,
+            }
+        # Never negative: a negative amount (bad servings or quantity) would add stock instead.
+        used = max(min(inv_amt, needed), 0.0)
+        if inv_item["quantity"] is not None:
+            remaining[key] = inv_amt - used
+        if used:
+            change = delta.setdefault(key, {"name": inv_item["name"], "used": 0.0, "unit": inv_unit})
+            change["used"] += used
+    return delta, missing_list
+
+
+def fold(quantity, change: dict):
+    """Applies one delta entry (`used` and/or `added`) to a stored quantity, never going below zero."""
+    if quantity is None:
+        return None
+    return max(quantity - change.get("used", 0.0) + change.get("added", 0.0), 0.0)
+
+
+class InventoryStore:
+    """Interface for inventory persistence shared by inventory_fetcher and inventory_manager."""
+
+    def load(self) -> dict:
+        """
+        Returns a snapshot in the `{"items": {name: {"quantity", "unit"}}}` JSON format, plus a
+        `version` that changes whenever the set of item names may have changed.
+        """
+        raise NotImplementedError
+
+    def version(self) -> str:
+        """The `version` that `load` would return, without reading any items."""
+        raise NotImplementedError
+
+    def append_delta(self, delta: dict):
+        """
+        Records the changes of one run (see `reconcile`) without rewriting the inventory.
+        Entries with `added` (purchases) may introduce items that aren't stocked yet.
+        """
+        raise NotImplementedError
+
+    def update(self, compute, keys=None):
+        """
+        Runs `compute(items)` against the current stock (in the form `reconcile` takes; only `keys`
+        when given) and appends the delta it returns, as one atomic step: no other run can take the
+        same stock in between. `compute` returns `(delta, result)`, which is passed back to the caller.
+        """
+        raise NotImplementedError
+
+    def compact(self):
+        """Folds recorded deltas into the base inventory."""
+        raise NotImplementedError
+
+    def import_json(self, path: str):
+        raise NotImplementedError
+
+    def export_json(self, path: str, indent: bool = False):
+        raise NotImplementedError
+
+
+class SQLiteInventoryStore(InventoryStore):
+    """
+    Inventory kept in SQLite and indexed by normalized ingredient name.
+    Runs never rewrite the items table: each one appends a compact delta to
+    `inventory_log`, and the log is folded back into `items` every
+    `compact_every` entries. Deltas are relative, so overlapping runs
+    (threads or processes) never lose each other's updates.
+    """
+
+    def __init__(self, path: str, compact_every: int = 50):
+        self.path = path
+        self.compact_every = compact_every
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "key TEXT PRIMARY KEY, name TEXT NOT NULL, quantity REAL, unit TEXT NOT NULL DEFAULT '')"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inventory_log ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, delta TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def is_empty(self) -> bool:
+        return self._connect().execute("SELECT 1 FROM items LIMIT 1").fetchone() is None
+
+    def _read(self, conn, keys=None):
+        if keys is None:
+            rows = conn.execute("SELECT key, name, quantity, unit FROM items ORDER BY rowid").fetchall()
+        else:
+            keys = set(keys)
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(f"SELECT key, name, quantity, unit FROM items WHERE key IN ({placeholders})", list(keys)).fetchall()
+        log = conn.execute("SELECT id, delta FROM inventory_log ORDER BY id").fetchall()
+        items = {key: [name, quantity, unit] for key, name, quantity, unit in rows}
+        metrics.add_payload("inventory", read=metrics.payload_bytes(rows) + metrics.payload_bytes(log))
+        for _, delta in log:
+            for key, change in loads(delta).items():
+                if keys is not None and key not in keys:
+                    continue
+                if key in items:
+                    items[key][1] = fold(items[key][1], change)
+                elif change.get("added"):
+                    items[key] = [change["name"], change["added"], change.get("unit", "")]
+        return items, log
+
+    def load(self) -> dict:
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            items, _ = self._read(conn)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.rollback()
+        return {
+            "items": {name: {"quantity": format_quantity(quantity), "unit": unit} for name, quantity, unit in items.values()},
+            "version": f"{os.path.abspath(self.path)}:{version}",
+        }
+
+    def version(self) -> str:
+        version = self._connect().execute("PRAGMA user_version").fetchone()[0]
+        return f"{os.path.abspath(self.path)}:{version}"
+
+    def _append(self, conn, delta: dict) -> int:
+        row = (time.time(), dumps(delta))
+        cursor = conn.execute("INSERT INTO inventory_log(ts, delta) VALUES (?, ?)", row)
+        added = [key for key, change in delta.items() if change.get("added")]
+        if added:
+            placeholders = ",".join("?" * len(added))
+            stocked = conn.execute(f"SELECT COUNT(*) FROM items WHERE key IN ({placeholders})", added).fetchone()[0]
+            if stocked < len(added):
+                # New item names: snapshots taken from now on get a new version for the name index.
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+        metrics.add_payload("inventory", written=metrics.payload_bytes([row]))
+        return cursor.lastrowid
+
+    def append_delta(self, delta: dict):
+        if not delta:
+            return
+        conn = self._connect()
+        with conn:
+            log_id = self._append(conn, delta)
+        if log_id % self.compact_every == 0:
+            self.compact()
+
+    def update(self, compute, keys=None):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            items, _ = self._read(conn, keys)
+            current = {
+                key: {"name": name, "quantity": quantity, "unit": normalize_unit(unit)}
+                for key, (name, quantity, unit) in items.items()
+            }
+            delta, result = compute(current)
+            log_id = self._append(conn, delta) if delta else None
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        if log_id and log_id % self.compact_every == 0:
+            self.compact()
+        return delta, result
+
+    def compact(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            items, log = self._read(conn)
+            if log:
+                conn.executemany(
+                    "INSERT INTO items(key, name, quantity, unit) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET quantity = excluded.quantity",
+                    [(key, name, quantity, unit) for key, (name, quantity, unit) in items.items()],
+                )
+                conn.execute("DELETE FROM inventory_log WHERE id <= ?", (log[-1][0],))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def import_json(self, path: str):
+        """
+        Loads an `inventory.json` file, merging entries whose names normalize to the same key.
+        When their amounts can't be added up (e.g. "3 cloves" and "10 g"), the first entry is
+        kept and the conflict is reported on stderr.
+        """
+        items = load_file(path).get("items", {})
+        merged = {}
+        for name, data in items.items():
+            key = normalize_name(name)
+            quantity = parse_quantity(data.get("quantity"))
+            unit = normalize_unit(data.get("unit", ""))
+            if key in merged:
+                _, first, previous, previous_unit = merged[key]
+                converted = convert(quantity, unit, previous_unit, first) if quantity is not None else None
+                if converted is None or previous is None:
+                    sys.stderr.write(
+                        f"inventory import: kept {first!r} ({format_quantity(previous)} {previous_unit}), "
+                        f"ignored {name!r} ({data.get('quantity')} {unit}): can't combine the amounts\n"
+                    )
+                    continue
+                quantity, unit, name = previous + converted, previous_unit, first
+            merged[key] = (key, name, quantity, unit)
+        self.compact()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO items(key, name, quantity, unit) VALUES (?, ?, ?, ?)",
+                merged.values(),
+            )
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+
+    def export_json(self, path: str, indent: bool = False):
+        dump_file({"items": self.load()["items"]}, path, indent)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_inventory_store() -> InventoryStore:
+    """Returns the process wide store, importing `inventory.json` the first time the database is created."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from src.config import INVENTORY_DB, INVENTORY_JSON, INVENTORY_COMPACT_EVERY
+            store = SQLiteInventoryStore(INVENTORY_DB, INVENTORY_COMPACT_EVERY)
+            if store.is_empty() and os.path.exists(INVENTORY_JSON):
+                store.import_json(INVENTORY_JSON)
+            _store = store
+    return _store
+
+
+def set_inventory_store(store: InventoryStore):
+    """Replaces the process wide store (benchmarks, tests)."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+if __name__ == "__main__":
+    # python -m src.inventory_store import|export [inventory.json] [--pretty]
+    pretty = "--pretty" in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != "--pretty"]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "export"):
+        sys.exit("usage: python -m src.inventory_store import|export [path] [--pretty]")
+    from src.config import INVENTORY_DB, INVENTORY_JSON
+    target = sys.argv[2] if len(sys.argv) > 2 else INVENTORY_JSON
+    store = SQLiteInventoryStore(INVENTORY_DB)
+    if sys.argv[1] == "import":
+        store.import_json(target)
+    else:
+        store.export_json(target, pretty)
@@ -0,0 +1,108 @@
+import time
+from langchain_core.utils.json import parse_partial_json
+from rich.console import Group
+from rich.spinner import Spinner
+from rich.table import Table
+from rich.text import Text
+from src.render import ingredients_table, instructions_panel, result_renderables
+
+NODE_LABELS = {
+    "recipe_fetcher": "Finding a recipe",
+    "inventory_fetcher": "Checking the pantry",
+    "recipe_scaler": "Scaling to your servings",
+    "inventory_manager": "Updating the inventory",
+    "shopping_list": "Writing the shopping list",
+    "printer": "Plating up",
+}
+
+# Nodes each step waits on; the recipe and pantry branches start together.
+UPSTREAM = {
+    "recipe_fetcher": (),
+    "inventory_fetcher": (),
+    "recipe_scaler": ("recipe_fetcher",),
+    "inventory_manager": ("recipe_scaler", "inventory_fetcher"),
+    "shopping_list": ("inventory_manager",),
+    "printer": ("inventory_manager",),
+}
+
+
+class LiveRecipeView:
+    """
+    Incrementally rendered view of a streamed graph run. Feed it the
+    `(mode, chunk)` pairs from `app.stream(..., stream_mode=["updates", "messages"])`
+    and pass it to `rich.live.Live` as the renderable.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.done = []
+        self.tool_args = ""
+        self.message_id = None
+        self.recipe = {}
+        self.values = {}
+        self.result = {}
+
+    def feed(self, mode: str, chunk):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") != "recipe_fetcher":
+                return
+            if message.id != self.message_id:
+                # A new answer (e.g. the large tier after a rejected fast-tier one) starts a fresh buffer.
+                self.message_id, self.tool_args = message.id, ""
+            for tool_chunk in getattr(message, "tool_call_chunks", None) or []:
+                self.tool_args += tool_chunk.get("args") or ""
+            if self.tool_args:
+                self.recipe = parse_partial_json(self.tool_args) or self.recipe
+            elif getattr(message, "tool_calls", None):
+                self.recipe = message.tool_calls[0]["args"]
+        elif mode == "updates":
+            self._collect(chunk)
+            for node in chunk:
+                self.done.append((node, time.perf_counter() - self.started))
+
+    def running(self) -> list:
+        """Nodes whose upstream steps have all finished but which haven't reported yet."""
+        done = dict(self.done)
+        needs_list = bool(self.result.get("missing_list"))
+        running = []
+        for node, upstream in UPSTREAM.items():
+            if node in done:
+                continue
+            if node == "shopping_list" and self.result and not needs_list:
+                continue
+            if node == "printer" and needs_list:
+                upstream = ("shopping_list",)
+            if all(step in done for step in upstream):
+                running.append(node)
+        return running
+
+    def _collect(self, chunk: dict):
+        for update in chunk.values():
+            update = update or {}
+            if update.get("recipe"):
+                self.recipe = update["recipe"]
+            self.values.update(update)
+        if "missing_list" in self.values:
+            self.result = self.values
+
+    def progress(self) -> Table:
+        table = Table.grid(padding=(0, 1))
+        for node, elapsed in self.done:
+            table.add_row(Text("✔", style="green"), Text(NODE_LABELS.get(node, node)), Text(f"{elapsed:.1f}s", style="dim"))
+        for node in self.running():
+            table.add_row(Spinner("dots", style="cyan"), Text(NODE_LABELS.get(node, node), style="cyan"), Text(""))
+        return table
+
+    def __rich__(self):
+        parts = [self.progress()]
+        if self.result:
+            parts.extend(result_renderables(self.result))
+        elif isinstance(self.recipe, dict):
+            ingredients = self.recipe.get("ingredients")
+            instructions = self.recipe.get("instructions")
+            if isinstance(ingredients, dict) and ingredients:
+                parts.append(ingredients_table(ingredients))
+            if isinstance(instructions, list) and instructions:
+                parts.append(instructions_panel([str(step) for step in instructions]))
+        return Group(*parts)
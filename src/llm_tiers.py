@@ -0,0 +1,108 @@
+"""
+Model-tier policy for recipe extraction. Each prompt goes to the fast model
+first; its Recipe tool call is validated and the prompt only escalates to the
+next tier (the large model) when that validation fails or the call errors. Calls are paced by
+each tier's rate limiter, and identical prompts in flight share one answer.
+"""
+from pydantic import ValidationError
+from src import metrics
+from src.config import LLM_COMPLETION_TOKENS, LLM_TIERS, get_llm
+from src.distill import estimate_tokens
+from src.models import Recipe
+from src.throttle import SingleFlight, get_rate_limiter
+from src.units import UNITS, normalize_unit, parse_quantity
+
+
+def validate_recipe(args) -> list:
+    """
+    Problems with a Recipe tool call that would break scaling or reconciliation.
+    An empty list means the answer is usable as-is.
+    """
+    try:
+        recipe = Recipe.model_validate(args)
+    except ValidationError as e:
+        return [f"{'.'.join(map(str, error['loc'])) or 'recipe'}: {error['msg']}" for error in e.errors()]
+
+    problems = []
+    if not recipe.ingredients:
+        problems.append("no ingredients")
+    if not recipe.instructions:
+        problems.append("no instructions")
+    for name, info in recipe.ingredients.items():
+        if not isinstance(info, dict) or "quantity" not in info:
+            problems.append(f"{name}: expected an object with quantity and unit")
+            continue
+        unit = normalize_unit(info.get("unit", ""))
+        if unit in UNITS and parse_quantity(info["quantity"]) is None:
+            problems.append(f"{name}: quantity {info['quantity']!r} is not a number of {unit}")
+    return problems
+
+
+_flights = SingleFlight("llm")
+
+
+def _reservation(prompt) -> int:
+    return estimate_tokens(str(prompt)) + LLM_COMPLETION_TOKENS
+
+
+def _reject(tier: str):
+    """
+    A non-final tier's call failed (e.g. Groq's 400 `tool_use_failed`, common with small
+    models and bound tools): counted like a rejected answer, and the next tier is tried.
+    """
+    metrics.count(f"llm_tier_{tier}_rejected")
+
+
+def _accept(tier: str, reserved: int, response, last: bool) -> bool:
+    usage = getattr(response, "usage_metadata", None) or {}
+    metrics.add_tokens(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+    get_rate_limiter(tier).settle(reserved, usage.get("total_tokens", 0))
+    problems = validate_recipe(response.tool_calls[0]["args"]) if response.tool_calls else ["no Recipe tool call"]
+    if problems:
+        metrics.count(f"llm_tier_{tier}_rejected")
+        # The last tier's answer is returned regardless; callers deal with a missing tool call.
+        return last
+    metrics.count(f"llm_tier_{tier}_hits")
+    return True
+
+
+def _extract(prompt):
+    reserved = _reservation(prompt)
+    for position, tier in enumerate(LLM_TIERS):
+        last = position == len(LLM_TIERS) - 1
+        get_rate_limiter(tier).acquire(reserved)
+        try:
+            response = get_llm(tier).bind_tools([Recipe]).invoke(prompt)
+        except Exception:
+            if last:
+                raise
+            _reject(tier)
+            continue
+        if _accept(tier, reserved, response, last):
+            return response
+
+
+async def _aextract(prompt):
+    reserved = _reservation(prompt)
+    for position, tier in enumerate(LLM_TIERS):
+        last = position == len(LLM_TIERS) - 1
+        await get_rate_limiter(tier).aacquire(reserved)
+        try:
+            response = await get_llm(tier).bind_tools([Recipe]).ainvoke(prompt)
+        except Exception:
+            if last:
+                raise
+            _reject(tier)
+            continue
+        if _accept(tier, reserved, response, last):
+            return response
+
+
+def extract_recipe(prompt):
+    """Runs `prompt` through the model tiers in order and returns the first response that validates."""
+    return _flights.do(prompt, lambda: _extract(prompt))
+
+
+async def aextract_recipe(prompt):
+    """Async variant of `extract_recipe`."""
+    return await _flights.ado(prompt, lambda: _aextract(prompt))
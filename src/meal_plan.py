@@ -0,0 +1,100 @@
+"""
+Multi-dish meal planning. Recipes are fetched and scaled concurrently, then
+all requirements are reconciled against the current stock in a single
+vectorized pass inside one atomic inventory update, followed by one
+shopping-list write.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.inventory_store import get_inventory_store, normalize_name
+from src.name_index import get_name_index
+from src.nodes.recipe_fetcher import recipe_fetcher
+from src.nodes.recipe_scaler import recipe_scaler
+from src.shopping_ledger import get_shopping_ledger
+from src.throttle import BATCH, priority
+from src.units import convert, format_quantity, parse_quantity, to_canonical
+
+
+def prepare_dish(request: dict) -> dict:
+    """Fetches and scales one dish using the regular graph nodes; its provider calls queue behind interactive ones."""
+    state = {"dish": request["dish"], "servings": request.get("servings", 2)}
+    with priority(BATCH):
+        state.update(recipe_fetcher(state))
+    state.update(recipe_scaler(state))
+    return {"dish": state["dish"], "servings": state["servings"], "scaled_recipe": state["scaled_recipe"]}
+
+
+def aggregate_requirements(dishes: list, items: dict, index) -> dict:
+    """
+    Sums every dish's scaled ingredients per inventory item, converted to the
+    stocked unit. Ingredients that aren't stocked, or can't be converted to the
+    stocked unit, are summed per canonical unit instead.
+    Returns `{key: {"name", "unit", "amount", "stocked"}}`.
+    """
+    requirements = {}
+    for dish in dishes:
+        for ingredient, data in dish["scaled_recipe"].get("ingredients", {}).items():
+            amount = parse_quantity((data or {}).get("quantity"))
+            if amount is None:
+                continue
+            unit = (data or {}).get("unit", "")
+            match = index.lookup(ingredient)
+            item = items.get(normalize_name(match)) if match is not None else None
+            needed = convert(amount, unit, item["unit"], ingredient) if item is not None else None
+            if needed is not None:
+                key, name, unit, stocked = normalize_name(match), item["name"], item["unit"], True
+            else:
+                needed, unit = to_canonical(amount, unit)
+                key, name, stocked = f"{normalize_name(ingredient)}|{unit}", ingredient, False
+            entry = requirements.setdefault(key, {"name": name, "unit": unit, "amount": 0.0, "stocked": stocked})
+            entry["amount"] += needed
+    return requirements
+
+
+def reconcile_plan(requirements: dict, items: dict):
+    """Vectorized requirements-vs-stock pass; returns the inventory delta and the combined missing list."""
+    keys = list(requirements)
+    need = np.array([requirements[k]["amount"] for k in keys], dtype=float)
+    stock = np.array(
+        [
+            (np.inf if items[k]["quantity"] is None else items[k]["quantity"]) if requirements[k]["stocked"] else 0.0
+            for k in keys
+        ],
+        dtype=float,
+    )
+    used = np.minimum(need, stock)
+    short = need > stock
+
+    delta, missing_list = {}, {}
+    for i in np.flatnonzero(used > 0):
+        key = keys[i]
+        delta[key] = {"name": requirements[key]["name"], "used": float(used[i]), "unit": requirements[key]["unit"]}
+    for i in np.flatnonzero(short):
+        entry = requirements[keys[i]]
+        missing = {
+            "required": format_quantity(float(need[i])),
+            "available": format_quantity(float(stock[i])),
+            "unit": entry["unit"],
+        }
+        if entry["name"] in missing_list:
+            # Another unit of the same ingredient (e.g. cloves and g of garlic): list it as "name (unit)".
+            missing_list[f"{entry['name']} ({entry['unit']})"] = {**missing, "name": entry["name"]}
+        else:
+            missing_list[entry["name"]] = missing
+    return delta, missing_list
+
+
+def plan_meals(requests: list, concurrency: int = 8) -> dict:
+    """Plans N dishes at once with a single inventory commit and a single shopping-list write."""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Each worker runs in a copy of the caller's context, so the metrics.run() around the plan sees its calls.
+        futures = [executor.submit(contextvars.copy_context().run, prepare_dish, request) for request in requests]
+        dishes = [future.result() for future in futures]
+
+    store = get_inventory_store()
+    index = get_name_index(store.load())
+    delta, missing_list = store.update(lambda items: reconcile_plan(aggregate_requirements(dishes, items, index), items))
+    if missing_list:
+        get_shopping_ledger().append(missing_list)
+    return {"dishes": dishes, "missing_list": missing_list, "inventory_delta": delta}
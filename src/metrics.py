@@ -0,0 +1,184 @@
+"""
+Lightweight per-run instrumentation with no tracing backend required.
+
+Wrap a graph invocation in `with metrics.run():` and every instrumented node,
+LLM call, inventory/shopping-list read and write and cache lookup inside it is recorded
+on that run. Process-wide totals are also kept for the Prometheus text endpoint.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_current = contextvars.ContextVar("foodie_run_metrics", default=None)
+_totals = defaultdict(float)
+_totals_lock = threading.Lock()
+
+
+class RunMetrics:
+    """Everything measured during one graph run."""
+
+    def __init__(self, run_id: str = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.started = time.time()
+        self.wall = 0.0
+        self.nodes = defaultdict(float)
+        self.tokens = defaultdict(int)
+        self.payload = defaultdict(lambda: {"read": 0, "written": 0})
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "started": self.started,
+            "wall": self.wall,
+            "nodes": dict(self.nodes),
+            "tokens": dict(self.tokens),
+            "payload": {kind: dict(v) for kind, v in self.payload.items()},
+            "counters": dict(self.counters),
+        }
+
+
+def current() -> RunMetrics:
+    return _current.get()
+
+
+def _total(name: str, value: float, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _totals_lock:
+        _totals[key] += value
+
+
+@contextmanager
+def run(run_id: str = None, sink: bool = True):
+    """Collects metrics for the graph run executed inside the block."""
+    metrics = RunMetrics(run_id)
+    token = _current.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.wall = time.perf_counter() - started
+        _current.reset(token)
+        _total("foodie_runs_total", 1)
+        _total("foodie_run_seconds_total", metrics.wall)
+        if sink:
+            write(metrics)
+
+
+def record_node(name: str, elapsed: float):
+    metrics = current()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.nodes[name] += elapsed
+    _total("foodie_node_seconds_total", elapsed, node=name)
+    _total("foodie_node_calls_total", 1, node=name)
+
+
+def add_tokens(prompt: int = 0, completion: int = 0):
+    metrics = current()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.tokens["prompt"] += prompt
+            metrics.tokens["completion"] += completion
+    _total("foodie_llm_tokens_total", prompt, kind="prompt")
+    _total("foodie_llm_tokens_total", completion, kind="completion")
+
+
+def payload_bytes(rows) -> int:
+    """Size of SQLite row values as stored: UTF-8 length for text, 8 bytes per number, nothing for NULL."""
+    size = 0
+    for row in rows:
+        for value in row:
+            if isinstance(value, str):
+                size += len(value.encode())
+            elif value is not None:
+                size += 8
+    return size
+
+
+def add_payload(kind: str, read: int = 0, written: int = 0):
+    """Records bytes of row values read from / written to a store (see `payload_bytes`), not disk I/O."""
+    metrics = current()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.payload[kind]["read"] += read
+            metrics.payload[kind]["written"] += written
+    _total("foodie_payload_bytes_total", read, kind=kind, direction="read")
+    _total("foodie_payload_bytes_total", written, kind=kind, direction="written")
+
+
+def count(name: str, value: int = 1):
+    metrics = current()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.counters[name] += value
+    _total(f"foodie_{name}_total", value)
+
+
+def instrument(name: str, fn):
+    """Wraps a graph node so its wall time is recorded; works for sync and async nodes."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                record_node(name, time.perf_counter() - started)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record_node(name, time.perf_counter() - started)
+    return wrapper
+
+
+def write(metrics: RunMetrics):
+    """Appends the run to the metrics JSONL file configured by FOODIE_METRICS_FILE."""
+    from src.config import METRICS_FILE
+    from src.serialization import dumpb
+    if not METRICS_FILE:
+        return
+    with open(METRICS_FILE, "ab") as f:
+        f.write(dumpb(metrics.to_dict()) + b"\n")
+
+
+def prometheus_text() -> str:
+    """Process-wide totals in the Prometheus text exposition format."""
+    with _totals_lock:
+        items = sorted(_totals.items())
+    lines = []
+    for (name, labels), value in items:
+        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+        lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Starts a background `/metrics` endpoint for Prometheus to scrape."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = prometheus_text().encode()
+            self.send_response(200 if self.path == "/metrics" else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
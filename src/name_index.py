@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+from collections import defaultdict
+from src.serialization import load_file
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+# Plurals in -ies whose singular doesn't end in -y
+_IES_PLURALS = {
+    "chilies": "chili", "chillies": "chilli", "cookies": "cookie", "pies": "pie",
+    "brownies": "brownie", "smoothies": "smoothie", "veggies": "veggie", "goodies": "goodie",
+}
+
+
+def singularize(word: str) -> str:
+    if word in _IES_PLURALS:
+        return _IES_PLURALS[word]
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(name: str) -> str:
+    """
+    Normal form used for matching: lowercase, preparation notes after a comma dropped,
+    punctuation stripped and every word singularized ("Tomatoes, diced" -> "tomato").
+    """
+    name = str(name).lower().split(",", 1)[0]
+    return " ".join(singularize(word) for word in _WORD.findall(name))
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Lookup from recipe ingredient names to inventory item names.
+    Tries the alias table, then the normalized form, then an approximate
+    match over a trigram inverted index (Dice similarity >= `threshold`).
+    """
+
+    def __init__(self, names, aliases: dict = None, threshold: float = 0.75):
+        self.threshold = threshold
+        self.aliases = {normalize_ingredient(k): normalize_ingredient(v) for k, v in (aliases or {}).items()}
+        self._exact = {}
+        self._normalized = {}
+        self._grams = []
+        self._postings = defaultdict(list)
+        for name in names:
+            self._exact.setdefault(name.lower().strip(), name)
+            key = normalize_ingredient(name)
+            if key in self._normalized:
+                continue
+            self._normalized[key] = name
+            grams = trigrams(key)
+            self._grams.append((name, len(grams)))
+            for gram in grams:
+                self._postings[gram].append(len(self._grams) - 1)
+
+    def __len__(self):
+        return len(self._normalized)
+
+    def lookup(self, name: str):
+        """Returns the matching inventory name, or None when nothing is close enough."""
+        exact = self._exact.get(str(name).lower().strip())
+        if exact is not None:
+            return exact
+        key = normalize_ingredient(name)
+        key = self.aliases.get(key, key)
+        if key in self._normalized:
+            return self._normalized[key]
+        if not key:
+            return None
+
+        grams = trigrams(key)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for idx in self._postings.get(gram, ()):
+                overlap[idx] += 1
+        best, best_score = None, self.threshold
+        for idx, shared in overlap.items():
+            candidate, size = self._grams[idx]
+            score = 2 * shared / (len(grams) + size)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+
+def load_aliases(path: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    return load_file(path)
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def cached_name_index(version):
+    """The index built for inventory `version` in this process, or None (e.g. after a resume elsewhere)."""
+    with _lock:
+        return _indexes.get(version) if version is not None else None
+
+
+def get_name_index(inventory: dict) -> NameIndex:
+    """
+    Returns the index for an inventory snapshot, building it once per inventory version
+    (the store bumps the version whenever the set of item names can change).
+    """
+    from src.config import INGREDIENT_ALIASES, NAME_MATCH_THRESHOLD
+    version = inventory.get("version")
+    with _lock:
+        index = _indexes.get(version) if version is not None else None
+        if index is None:
+            index = NameIndex(inventory.get("items", {}).keys(), load_aliases(INGREDIENT_ALIASES), NAME_MATCH_THRESHOLD)
+            if version is not None:
+                _indexes.clear()
+                _indexes[version] = index
+    return index
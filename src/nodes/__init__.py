@@ -1,5 +1,5 @@
-from .recipe_fetcher import recipe_fetcher
-from .inventory_fetcher import inventory_fetcher
+from .recipe_fetcher import recipe_fetcher, arecipe_fetcher
+from .inventory_fetcher import inventory_fetcher, ainventory_fetcher
 from .recipe_scaler import recipe_scaler
 from .inventory_manager import inventory_manager
 from .shopping_list import shopping_list
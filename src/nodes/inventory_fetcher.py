@@ -1,25 +1,24 @@
-import json
-from langchain_core.messages import ToolMessage
+import asyncio
 from src.state import AgentState
+from src.inventory_store import get_inventory_store
+from src.name_index import cached_name_index, get_name_index
 
 def inventory_fetcher(state: AgentState):
-    """Fetches the ingredients from inventory for the recipe."""
-    with open("inventory.json", "r") as f:
-        inventory = json.load(f)
-    state["inventory"] = inventory
+    """
+    Warms the ingredient-name index for the current inventory version, loading the inventory
+    only when this process hasn't built that index yet.
+    Doesn't depend on the recipe, so it runs in parallel with recipe_fetcher.
+    Only the version goes into the state, so checkpoints don't grow with the pantry;
+    inventory_manager finds the index again by that version.
+    """
+    store = get_inventory_store()
+    version = store.version()
+    if cached_name_index(version) is None:
+        inventory = store.load()
+        get_name_index(inventory)
+        version = inventory["version"]
+    return {"inventory": {"version": version}}
 
-    recipe_tool_call = state["messages"][-1].tool_calls[0]
-    recipe_ingredients = recipe_tool_call["args"]["ingredients"]
-
-    inventory_items = inventory.get("items", {}).keys()
-    missing_items = {}
-    for item, quantity in recipe_ingredients.items():
-        if item not in inventory_items:
-            missing_items[item] = quantity
-
-    if missing_items:
-        state["messages"].append(ToolMessage(tool_call_id=recipe_tool_call["id"], content=json.dumps({"missing_items": missing_items})))
-    else:
-        state["messages"].append(ToolMessage(tool_call_id=recipe_tool_call["id"], content=json.dumps({"recipe": recipe_tool_call["args"]})))
-
-    return state
+async def ainventory_fetcher(state: AgentState):
+    """Async variant of `inventory_fetcher`; the SQLite read runs in a worker thread."""
+    return await asyncio.to_thread(inventory_fetcher, state)
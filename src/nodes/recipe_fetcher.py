@@ -1,15 +1,35 @@
-from langchain_community.tools import DuckDuckGoSearchRun
+import asyncio
+import uuid
+from langchain_core.messages import AIMessage
+from pydantic import ValidationError
+from src import metrics
 from src.state import AgentState
-from src.config import llm
-from src.models import Recipe
+from src.config import SEARCH_TOKEN_BUDGET
+from src.distill import distill, estimate_tokens
+from src.llm_tiers import aextract_recipe, extract_recipe
+from src.recipe_cache import get_recipe_cache, normalize_dish
+from src.recipe_library import get_recipe_library
+from src.search import get_search
 
-def recipe_fetcher(state: AgentState):
-    """Fetches a recipe based on the user's request."""
-    search = DuckDuckGoSearchRun()
-    dish_query = state["messages"][0]
-    search_results = search.run(f"recipe for {dish_query} for 2 serving")
+def _dish(state: AgentState) -> str:
+    return state.get("dish") or normalize_dish(state["messages"][0])
+
+def _cached(dish: str):
+    cached = get_recipe_cache().get(dish)
+    if cached is None:
+        return None
+    message = AIMessage(
+        content="",
+        tool_calls=[{"name": "Recipe", "args": cached, "id": f"cache-{uuid.uuid4().hex}"}],
+    )
+    return {"messages": [message], "dish": dish, "recipe": cached}
+
+def _search_query(dish: str) -> str:
+    return f"recipe for {normalize_dish(dish)} for 2 serving"
 
-    prompt = f"""
+def build_prompt(dish: str, search_results: str) -> str:
+    dish_query = f"Prepare a recipe for {dish}."
+    return f"""
         You are a culinary assistant. Your task is to output a standardized recipe JSON with normalized units.
 
         - Normalize all measurements to the following units wherever applicable:
@@ -45,7 +65,42 @@ def recipe_fetcher(state: AgentState):
         Give detailed instructions.
     """
 
-    llm_with_tools = llm.bind_tools([Recipe])
-    response = llm_with_tools.invoke(prompt)
-    state["messages"].append(response)
-    return state
+def _prompt(dish: str, search_results: str) -> str:
+    """Builds the prompt from distilled search results, recording its estimated size before and after."""
+    prompt = build_prompt(dish, distill(search_results, dish, SEARCH_TOKEN_BUDGET))
+    metrics.count("prompt_tokens_raw", estimate_tokens(build_prompt(dish, search_results)))
+    metrics.count("prompt_tokens_distilled", estimate_tokens(prompt))
+    return prompt
+
+def _finish(dish: str, response):
+    if not response.tool_calls:
+        raise ValueError(f"The model did not return a Recipe tool call for {dish!r}.")
+    recipe = response.tool_calls[0]["args"]
+    try:
+        get_recipe_cache().put(dish, recipe)
+        get_recipe_library().add(dish, recipe)
+    except ValidationError:
+        pass
+    return {"messages": [response], "dish": dish, "recipe": recipe}
+
+def recipe_fetcher(state: AgentState):
+    """Fetches a recipe based on the user's request, serving repeats from the recipe cache."""
+    dish = _dish(state)
+    cached = _cached(dish)
+    if cached is not None:
+        return cached
+
+    search_results = get_search().run(_search_query(dish))
+    response = extract_recipe(_prompt(dish, search_results))
+    return _finish(dish, response)
+
+async def arecipe_fetcher(state: AgentState):
+    """Async variant of `recipe_fetcher`: blocking cache and search calls run in worker threads."""
+    dish = _dish(state)
+    cached = await asyncio.to_thread(_cached, dish)
+    if cached is not None:
+        return cached
+
+    search_results = await asyncio.to_thread(get_search().run, _search_query(dish))
+    response = await aextract_recipe(_prompt(dish, search_results))
+    return await asyncio.to_thread(_finish, dish, response)
@@ -0,0 +1,62 @@
+"""
+Machine-readable result output. Results are serialized through
+src.serialization into an in-memory buffer that is written to the
+underlying binary stream in large chunks; nothing here imports rich.
+"""
+import threading
+from src.serialization import dumpb
+
+FORMATS = ("rich", "json", "ndjson")
+
+
+class ResultWriter:
+    """
+    Streams result dicts to a binary stream as NDJSON (one object per line) or
+    JSON (a single array, or a single object with `single=True`). Writes are
+    buffered up to `buffer_size` bytes and are safe to call from several threads.
+    """
+
+    def __init__(self, stream, fmt: str = "ndjson", single: bool = False, buffer_size: int = 64 * 1024):
+        if fmt not in ("json", "ndjson"):
+            raise ValueError(f"Unsupported output format for ResultWriter: {fmt!r}")
+        self.stream = stream
+        self.fmt = fmt
+        self.single = single
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+    def write(self, result: dict):
+        with self._lock:
+            if self.fmt == "json" and not self.single:
+                self._buffer += b"[" if self.count == 0 else b",\n"
+            self._buffer += dumpb(result)
+            if self.fmt == "ndjson" or self.single:
+                self._buffer += b"\n"
+            self.count += 1
+            if len(self._buffer) >= self.buffer_size:
+                self._drain()
+
+    def _drain(self):
+        self.stream.write(self._buffer)
+        self._buffer.clear()
+
+    def flush(self):
+        """Writes out everything buffered so far, e.g. so a tailing reader sees finished results."""
+        with self._lock:
+            self._drain()
+            self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            if self.fmt == "json" and not self.single:
+                self._buffer += b"]\n" if self.count else b"[]\n"
+            self._drain()
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,133 @@
+import re
+import sqlite3
+import threading
+import time
+from src import metrics
+from src.models import Recipe
+from src.serialization import dumps, loads
+
+_PREFIX = re.compile(r"^\s*prepare a recipe for\s+", re.IGNORECASE)
+
+
+def normalize_dish(query) -> str:
+    """Turns a user query (string or message) into a stable cache key."""
+    text = getattr(query, "content", query)
+    text = _PREFIX.sub("", str(text)).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class RecipeCache:
+    """
+    SQLite backed cache of validated 2-serving `Recipe` tool-call args.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the cache holds more than `max_entries`.
+    """
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                dish TEXT PRIMARY KEY,
+                args TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS recipes_accessed ON recipes(accessed_at);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _bump(self, name: str):
+        self._conn.execute(
+            "INSERT INTO stats(name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, dish):
+        """Returns the cached recipe args for `dish`, or None on a miss."""
+        key = normalize_dish(dish)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT args, created_at FROM recipes WHERE dish = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl:
+                self._conn.execute("UPDATE recipes SET accessed_at = ? WHERE dish = ?", (now, key))
+                self._bump("hits")
+                self.hits += 1
+                metrics.count("recipe_cache_hits")
+                return loads(row[0])
+            if row:
+                self._conn.execute("DELETE FROM recipes WHERE dish = ?", (key,))
+            self._bump("misses")
+            self.misses += 1
+            metrics.count("recipe_cache_misses")
+        return None
+
+    def put(self, dish, args: dict):
+        """Validates and stores the recipe args, evicting the LRU entries if needed."""
+        Recipe(**args)
+        key = normalize_dish(dish)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recipes(dish, args, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, dumps(args), now, now),
+            )
+            self._conn.execute("DELETE FROM recipes WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM recipes WHERE dish IN ("
+                "SELECT dish FROM recipes ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def entries(self) -> list:
+        """Every cached `(dish, args)` pair, expired or not."""
+        with self._lock:
+            rows = self._conn.execute("SELECT dish, args FROM recipes").fetchall()
+        return [(dish, loads(args)) for dish, args in rows]
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process and across all runs."""
+        with self._lock:
+            totals = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = self._conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+            "entries": entries,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_recipe_cache() -> RecipeCache:
+    """Returns the process wide recipe cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from src.config import RECIPE_CACHE_PATH, RECIPE_CACHE_TTL, RECIPE_CACHE_MAX_ENTRIES
+            _cache = RecipeCache(RECIPE_CACHE_PATH, RECIPE_CACHE_TTL, RECIPE_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def set_recipe_cache(cache: RecipeCache):
+    """Replaces the process wide recipe cache (benchmarks, tests)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,320 @@
+"""
+Local library of every validated recipe, for "what can I cook now?" queries
+without a web search. Recipes are kept in SQLite with an FTS5 index over
+dish, name, ingredients and instructions, and with precomputed ingredient
+vectors: one row per (recipe, ingredient, canonical unit). `cook_now` loads
+the vectors once into a recipe x ingredient matrix and scores every stored
+recipe against the inventory in one vectorized pass.
+"""
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import numpy as np
+from src.models import Recipe
+from src.name_index import NameIndex, load_aliases, normalize_ingredient
+from src.recipe_cache import normalize_dish
+from src.serialization import dumps, loads
+from src.units import NON_SCALABLE_UNITS, UNITS, convert, normalize_unit, parse_quantity, to_canonical
+
+_WORD = re.compile(r"\w+")
+
+
+def recipe_vector(ingredients: dict) -> dict:
+    """
+    `{(ingredient key, canonical unit): amount}` for a recipe's ingredients. Amounts of the
+    same ingredient and unit are summed; non-numeric quantities ("to taste") are None.
+    """
+    vector = {}
+    for name, data in ingredients.items():
+        key = normalize_ingredient(name)
+        if not key:
+            continue
+        data = data if isinstance(data, dict) else {}
+        amount, unit = to_canonical(parse_quantity(data.get("quantity")), data.get("unit", ""))
+        previous = vector.get((key, unit))
+        vector[(key, unit)] = amount if previous is None or amount is None else previous + amount
+    return vector
+
+
+class _Matrix:
+    """The library's ingredient vectors as flat arrays, entries grouped by recipe (CSR order)."""
+
+    def __init__(self, conn, version: int):
+        self.version = version
+        recipes = conn.execute("SELECT id, dish, name FROM recipes ORDER BY id").fetchall()
+        self.ids = np.array([row[0] for row in recipes], dtype=np.int64)
+        self.dishes = [row[1] for row in recipes]
+        self.names = [row[2] for row in recipes]
+        self.vocab = [key for _, key in conn.execute("SELECT id, key FROM ingredients ORDER BY id")]
+        self.units = [unit for _, unit in conn.execute("SELECT id, unit FROM units ORDER BY id")]
+        self.unit_codes = {unit: code for code, unit in enumerate(self.units)}
+
+        entries = conn.execute(
+            "SELECT recipe_id, ingredient_id, unit_id, amount FROM recipe_ingredients ORDER BY recipe_id"
+        ).fetchall()
+        entries = np.array(entries, dtype=np.float64).reshape(-1, 4)
+        self.rows = np.searchsorted(self.ids, entries[:, 0].astype(np.int64))
+        # Ingredient and unit ids are rowids counting up from 1; vocabulary rows are never deleted.
+        self.cols = entries[:, 1].astype(np.int64) - 1
+        self.unit_of = entries[:, 2].astype(np.int64) - 1
+        self.amounts = entries[:, 3]
+        scalable = np.array([unit not in NON_SCALABLE_UNITS for unit in self.units], dtype=bool)
+        self.scalable = scalable[self.unit_of] if len(self.units) else np.zeros(0, dtype=bool)
+        self.indptr = np.searchsorted(self.rows, np.arange(len(self.ids) + 1))
+        self.sizes = np.diff(self.indptr)
+
+        from src.config import INGREDIENT_ALIASES, NAME_MATCH_THRESHOLD
+        self.vocab_index = NameIndex(self.vocab, load_aliases(INGREDIENT_ALIASES), NAME_MATCH_THRESHOLD)
+        self.vocab_codes = {key: code for code, key in enumerate(self.vocab)}
+
+    def stock(self, inventory: dict) -> np.ndarray:
+        """Inventory as an ingredient x unit matrix; items with a non-numeric quantity count as plenty."""
+        stock = np.zeros((len(self.vocab), len(self.units)))
+        for name, data in inventory.get("items", {}).items():
+            key = self.vocab_index.lookup(name)
+            if key is None:
+                continue
+            row = self.vocab_codes[key]
+            quantity, unit = parse_quantity(data.get("quantity")), normalize_unit(data.get("unit", ""))
+            if quantity is None:
+                stock[row] = np.inf
+                continue
+            if unit in UNITS:
+                for base in ("g", "ml"):
+                    converted = convert(quantity, unit, base, name)
+                    if converted is not None and base in self.unit_codes:
+                        stock[row, self.unit_codes[base]] += converted
+            elif unit in self.unit_codes:
+                stock[row, self.unit_codes[unit]] += quantity
+        return np.maximum(stock, 0)
+
+    def score(self, inventory: dict, servings: int):
+        """
+        Per-entry fraction of the required amount in stock, then per recipe its coverage (mean
+        fraction) and missing cost (ingredient-equivalents to buy: the sum of the shortfalls).
+        """
+        stock = self.stock(inventory)
+        required = self.amounts * np.where(self.scalable, servings / 2, 1.0)
+        available = stock[self.cols, self.unit_of]
+        numeric = ~np.isnan(required)
+        in_stock = (stock > 0).any(axis=1)[self.cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(required > 0, np.minimum(available / required, 1.0), 1.0)
+        fraction = np.where(numeric, fraction, in_stock.astype(np.float64))
+        count = len(self.ids)
+        missing_cost = np.bincount(self.rows, weights=1.0 - fraction, minlength=count)
+        coverage = np.divide(
+            np.bincount(self.rows, weights=fraction, minlength=count),
+            self.sizes,
+            out=np.zeros(count),
+            where=self.sizes > 0,
+        )
+        return fraction, coverage, missing_cost
+
+
+class RecipeLibrary:
+    """
+    SQLite recipe library: `recipes` (validated 2-serving Recipe args), the `recipes_fts`
+    full-text index, and the ingredient vectors in `recipe_ingredients` keyed into the
+    `ingredients` and `units` vocabularies. Unlike the recipe cache, nothing expires.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                id INTEGER PRIMARY KEY,
+                dish TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                args TEXT NOT NULL,
+                added_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+                dish, name, ingredients, instructions, tokenize = 'porter unicode61'
+            );
+            CREATE TABLE IF NOT EXISTS ingredients (id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS units (id INTEGER PRIMARY KEY, unit TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS recipe_ingredients (
+                recipe_id INTEGER NOT NULL,
+                ingredient_id INTEGER NOT NULL,
+                unit_id INTEGER NOT NULL,
+                amount REAL,
+                PRIMARY KEY (recipe_id, ingredient_id, unit_id)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+    def _code(self, table: str, column: str, value: str, codes: dict) -> int:
+        code = codes.get(value)
+        if code is None:
+            self._conn.execute(f"INSERT OR IGNORE INTO {table}({column}) VALUES (?)", (value,))
+            code = self._conn.execute(f"SELECT id FROM {table} WHERE {column} = ?", (value,)).fetchone()[0]
+            codes[value] = code
+        return code
+
+    def add_many(self, recipes) -> int:
+        """
+        Validates and stores `(dish, args)` pairs in one transaction, replacing earlier versions
+        of the same dish. Raises pydantic's ValidationError (storing nothing) on an invalid recipe.
+        """
+        recipes = [(normalize_dish(dish), Recipe.model_validate(args), args) for dish, args in recipes]
+        now = time.time()
+        ingredient_codes, unit_codes = {}, {}
+        with self._lock, self._conn:
+            for dish, recipe, args in recipes:
+                row = self._conn.execute("SELECT id FROM recipes WHERE dish = ?", (dish,)).fetchone()
+                if row:
+                    recipe_id = row[0]
+                    self._conn.execute(
+                        "UPDATE recipes SET name = ?, args = ?, added_at = ? WHERE id = ?",
+                        (recipe.recipe_name, dumps(args), now, recipe_id),
+                    )
+                    self._conn.execute("DELETE FROM recipes_fts WHERE rowid = ?", (recipe_id,))
+                    self._conn.execute("DELETE FROM recipe_ingredients WHERE recipe_id = ?", (recipe_id,))
+                else:
+                    recipe_id = self._conn.execute(
+                        "INSERT INTO recipes(dish, name, args, added_at) VALUES (?, ?, ?, ?)",
+                        (dish, recipe.recipe_name, dumps(args), now),
+                    ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO recipes_fts(rowid, dish, name, ingredients, instructions) VALUES (?, ?, ?, ?, ?)",
+                    (recipe_id, dish, recipe.recipe_name, " ".join(recipe.ingredients), " ".join(recipe.instructions)),
+                )
+                self._conn.executemany(
+                    "INSERT INTO recipe_ingredients(recipe_id, ingredient_id, unit_id, amount) VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            recipe_id,
+                            self._code("ingredients", "key", key, ingredient_codes),
+                            self._code("units", "unit", unit, unit_codes),
+                            amount,
+                        )
+                        for (key, unit), amount in recipe_vector(recipe.ingredients).items()
+                    ],
+                )
+            if recipes:
+                version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+                self._conn.execute(f"PRAGMA user_version = {version + 1}")
+        return len(recipes)
+
+    def add(self, dish, args: dict):
+        """Validates and stores one recipe (see `add_many`)."""
+        self.add_many([(dish, args)])
+
+    def get(self, dish):
+        with self._lock:
+            row = self._conn.execute("SELECT args FROM recipes WHERE dish = ?", (normalize_dish(dish),)).fetchone()
+        return loads(row[0]) if row else None
+
+    def _match(self, text: str) -> str:
+        # Every word must appear somewhere; quoting keeps FTS5 operators in user input literal.
+        return " ".join(f'"{word}"' for word in _WORD.findall(str(text).lower()))
+
+    def search(self, text: str, limit: int = 20) -> list:
+        """Full-text search over dish, name, ingredients and instructions, best matches first."""
+        match = self._match(text)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.dish, r.name FROM recipes_fts JOIN recipes r ON r.id = recipes_fts.rowid "
+                "WHERE recipes_fts MATCH ? ORDER BY bm25(recipes_fts) LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [{"dish": dish, "name": name} for dish, name in rows]
+
+    def matrix(self) -> _Matrix:
+        """The recipe x ingredient matrix, reloaded only after recipes were added."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if self._matrix is None or self._matrix.version != version:
+                self._matrix = _Matrix(self._conn, version)
+            return self._matrix
+
+    def cook_now(self, inventory: dict, k: int = 10, servings: int = 2, query: str = None) -> list:
+        """
+        The top `k` stored dishes for `inventory`: highest coverage first, then lowest missing cost.
+        `query` restricts the candidates to full-text matches. No network calls are made.
+        """
+        match = self._match(query) if query else None
+        if match == "":
+            # Nothing searchable in the query (e.g. "!!"), so nothing can match it.
+            return []
+        matrix = self.matrix()
+        if not len(matrix.ids):
+            return []
+        fraction, coverage, missing_cost = matrix.score(inventory, int(servings or 2))
+        candidates = np.ones(len(matrix.ids), dtype=bool)
+        if match:
+            with self._lock:
+                ids = [row[0] for row in self._conn.execute("SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH ?", (match,))]
+            candidates[:] = False
+            positions = np.searchsorted(matrix.ids, ids)
+            candidates[positions[positions < len(matrix.ids)]] = True
+        order = np.lexsort((missing_cost, -coverage))
+        order = order[candidates[order]][:k]
+
+        results = []
+        for row in order:
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            missing = [matrix.vocab[col] for col, part in zip(matrix.cols[start:end], fraction[start:end]) if part < 1]
+            results.append({
+                "dish": matrix.dishes[row],
+                "name": matrix.names[row],
+                "coverage": round(float(coverage[row]), 4),
+                "missing_cost": round(float(missing_cost[row]), 4),
+                "missing": missing,
+            })
+        return results
+
+    def import_cache(self, cache) -> int:
+        """Adds every recipe held by a RecipeCache; returns how many were imported."""
+        return self.add_many(cache.entries())
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_recipe_library() -> RecipeLibrary:
+    """Returns the process wide library, seeded from the recipe cache the first time it is created."""
+    global _library
+    with _library_lock:
+        if _library is None:
+            from src.config import RECIPE_LIBRARY_PATH
+            from src.recipe_cache import get_recipe_cache
+            library = RecipeLibrary(RECIPE_LIBRARY_PATH)
+            if not len(library):
+                library.import_cache(get_recipe_cache())
+            _library = library
+    return _library
+
+
+def set_recipe_library(library: RecipeLibrary):
+    """Replaces the process wide library (benchmarks, tests)."""
+    global _library
+    _library = library
+
+
+if __name__ == "__main__":
+    # python -m src.recipe_library search <words> | import
+    if len(sys.argv) < 2 or sys.argv[1] not in ("search", "import"):
+        sys.exit("usage: python -m src.recipe_library search <words> | import")
+    library = get_recipe_library()
+    if sys.argv[1] == "search":
+        print(dumps(library.search(" ".join(sys.argv[2:])), indent=True))
+    else:
+        from src.recipe_cache import get_recipe_cache
+        print(f"Imported {library.import_cache(get_recipe_cache())} recipes into {os.path.abspath(library.path)}")
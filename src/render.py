@@ -0,0 +1,81 @@
+"""Rich renderables for results; only imported when output is rendered for a terminal."""
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from src.units import format_quantity
+
+
+def ingredients_table(ingredients: dict) -> Table:
+    table = Table(title="📝 Ingredients")
+    table.add_column("Ingredient", style="cyan")
+    table.add_column("Quantity", style="magenta")
+    table.add_column("Unit", style="green")
+    for name, det in ingredients.items():
+        det = det if isinstance(det, dict) else {}
+        table.add_row(
+            str(name),
+            str(det.get("quantity", "")),
+            str(det.get("unit", "")),
+        )
+    return table
+
+
+def shopping_list_table(missing: dict) -> Table:
+    table = Table(title="🛒 Shopping List (Missing)")
+    table.add_column("Item", style="yellow")
+    table.add_column("Required", style="magenta")
+    table.add_column("Available", style="cyan")
+    table.add_column("Unit", style="green")
+    for name, det in missing.items():
+        table.add_row(
+            str(name),
+            str(det.get("required", "")),
+            str(det.get("available", "")),
+            str(det.get("unit", "")),
+        )
+    return table
+
+
+def instructions_panel(instructions: list) -> Panel:
+    steps = "\n".join(f"[bold green]{i+1}.[/bold green] {step}" for i, step in enumerate(instructions))
+    return Panel(steps, title="👩‍🍳 Cooking Instructions", style="bright_blue")
+
+
+def inventory_delta_table(delta: dict) -> Table:
+    table = Table(title="📦 Used From Inventory")
+    table.add_column("Item", style="blue")
+    table.add_column("Used", style="magenta")
+    table.add_column("Unit", style="green")
+    for det in delta.values():
+        table.add_row(str(det.get("name", "")), format_quantity(det.get("used", 0)), str(det.get("unit", "")))
+    return table
+
+
+def result_renderables(data: dict) -> list:
+    """Builds the ingredients, instructions, shopping list and inventory views for a result payload."""
+    renderables = []
+    recipe = data.get("scaled_recipe") or data.get("recipe")
+    if recipe:
+        if recipe.get("ingredients"):
+            renderables.append(ingredients_table(recipe["ingredients"]))
+        if recipe.get("instructions"):
+            renderables.append(instructions_panel(recipe["instructions"]))
+    if data.get("missing_list"):
+        renderables.append(shopping_list_table(data["missing_list"]))
+    if data.get("inventory_delta"):
+        renderables.append(inventory_delta_table(data["inventory_delta"]))
+    return renderables
+
+
+def render_result(state: dict, console: Console = None):
+    """
+    Pretty prints a result with rich:
+    - Ingredients table
+    - Numbered instructions
+    - Shopping/missing list table (if present)
+    - Items used from the inventory
+    """
+    console = console or Console()
+    for renderable in result_renderables(state):
+        console.print(renderable)
+    console.print("[bold green]✅ All done![/bold green] If a shopping list appeared above, you need to buy missing items.")
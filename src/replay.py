@@ -0,0 +1,137 @@
+"""
+Offline stand-ins for the Groq chat model and the web search, used by the
+benchmark harness. They replay recorded `Recipe` tool calls (or synthesize
+one) and recorded search results with configurable simulated latency.
+"""
+import copy
+import hashlib
+import random
+import re
+import threading
+import time
+import uuid
+from langchain_core.messages import AIMessage
+from src.recipe_cache import normalize_dish
+from src.search import SearchProvider
+from src.serialization import dump_file, load_file
+
+_DISH = re.compile(r"Prepare a recipe for (.+?)\.\s*$", re.MULTILINE)
+
+SYNTHETIC_INGREDIENTS = [
+    ("onion", "1", "medium"), ("garlic", "3", "cloves"), ("ginger", "1", "tsp"), ("tomatoes", "2", "cup"),
+    ("ghee", "2", "tbsp"), ("olive oil", "2", "tbsp"), ("salt", "to taste", ""), ("cumin seeds", "1", "tsp"),
+    ("garam masala", "0.5", "tsp"), ("turmeric powder", "0.25", "tsp"), ("paneer", "200", "g"),
+    ("spinach", "4", "cup"), ("rice", "1", "cup"), ("flour", "1", "cup"), ("butter", "2", "tbsp"),
+    ("eggs", "2", ""), ("milk", "1", "cup"), ("sugar", "2", "tbsp"), ("water", "2", "cup"),
+    ("heavy cream", "0.25", "cup"), ("green chilies", "2", "tsp"), ("coriander powder", "1", "tsp"),
+]
+
+
+def dish_from_prompt(prompt) -> str:
+    text = getattr(prompt, "content", prompt)
+    match = _DISH.search(str(text))
+    return normalize_dish(match.group(1)) if match else normalize_dish(text)
+
+
+def synthetic_recipe(dish: str) -> dict:
+    """Deterministic fake recipe for dishes without a recording."""
+    rng = random.Random(hashlib.sha1(dish.encode()).hexdigest())
+    picks = rng.sample(SYNTHETIC_INGREDIENTS, 10)
+    return {
+        "recipe_name": dish.title(),
+        "ingredients": {name: {"quantity": qty, "unit": unit} for name, qty, unit in picks},
+        "instructions": [f"Step {i + 1}: prepare the {name} and add it to the pan." for i, (name, _, _) in enumerate(picks)],
+    }
+
+
+class ReplayLLM:
+    """Chat model stand-in: answers every prompt with a recorded or synthetic Recipe tool call."""
+
+    def __init__(self, recordings: dict = None, latency: float = 0.0, reject_rate: float = 0.0):
+        self.recordings = {normalize_dish(k): v for k, v in (recordings or {}).items()}
+        self.latency = latency
+        # Share of answers returned without ingredients, to exercise escalation to a larger model tier
+        self.reject_rate = reject_rate
+        self._random = random.Random(0)
+        self.calls = 0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, prompt) -> AIMessage:
+        self.calls += 1
+        dish = dish_from_prompt(prompt)
+        args = self.recordings.get(dish) or synthetic_recipe(dish)
+        if self.reject_rate and self._random.random() < self.reject_rate:
+            args = {**args, "ingredients": {}}
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": "Recipe", "args": args, "id": f"replay-{uuid.uuid4().hex}"}],
+            usage_metadata={"input_tokens": len(str(prompt)) // 4, "output_tokens": 300, "total_tokens": len(str(prompt)) // 4 + 300},
+        )
+
+    def invoke(self, prompt, *args, **kwargs) -> AIMessage:
+        time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def ainvoke(self, prompt, *args, **kwargs) -> AIMessage:
+        import asyncio
+        await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+
+class RecordingLLM:
+    """Wraps a real chat model and records every Recipe tool call by dish into a JSON file."""
+
+    def __init__(self, llm, path: str):
+        self.llm = llm
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self.recordings = load_file(path)
+        except FileNotFoundError:
+            self.recordings = {}
+
+    def share(self, llm):
+        """Recorder for another model tier that writes into the same recordings file."""
+        other = copy.copy(self)
+        other.llm = llm
+        return other
+
+    def bind_tools(self, tools, **kwargs):
+        bound = self.llm.bind_tools(tools, **kwargs)
+        recorder = self
+
+        class _Bound:
+            def invoke(self, prompt, *args, **kw):
+                response = bound.invoke(prompt, *args, **kw)
+                recorder.record(prompt, response)
+                return response
+
+            async def ainvoke(self, prompt, *args, **kw):
+                response = await bound.ainvoke(prompt, *args, **kw)
+                recorder.record(prompt, response)
+                return response
+
+        return _Bound()
+
+    def record(self, prompt, response):
+        if not response.tool_calls:
+            return
+        with self._lock:
+            self.recordings[dish_from_prompt(prompt)] = response.tool_calls[0]["args"]
+            dump_file(self.recordings, self.path, indent=True)
+
+
+class LatencyProvider(SearchProvider):
+    """Adds simulated network latency in front of another search provider."""
+
+    name = "latency"
+
+    def __init__(self, provider: SearchProvider, latency: float):
+        self.provider = provider
+        self.latency = latency
+
+    def run(self, query: str) -> str:
+        time.sleep(self.latency)
+        return self.provider.run(query)
@@ -0,0 +1,7 @@
+def extract_result(final_state: dict) -> dict:
+    """Pulls the scaled recipe, missing list and inventory delta out of a final graph state."""
+    return {
+        "recipe": final_state.get("scaled_recipe"),
+        "missing_list": final_state.get("missing_list", {}),
+        "inventory_delta": final_state.get("inventory_delta", {}),
+    }
@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from src import metrics
+from src.serialization import load_file
+from src.throttle import SingleFlight, get_rate_limiter
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases and collapses whitespace so equivalent queries share a cache entry."""
+    return " ".join(str(query).lower().split())
+
+
+class SearchError(RuntimeError):
+    """Raised when a search could not be completed within the retry policy."""
+
+
+class SearchProvider:
+    """Interface for web search backends used by recipe_fetcher."""
+
+    name = "base"
+
+    def run(self, query: str) -> str:
+        raise NotImplementedError
+
+
+class DuckDuckGoProvider(SearchProvider):
+    """Live DuckDuckGo search; the tool is built once and reused."""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        from langchain_community.tools import DuckDuckGoSearchRun
+        self._tool = DuckDuckGoSearchRun()
+
+    def run(self, query: str) -> str:
+        return self._tool.run(query)
+
+
+class FixtureProvider(SearchProvider):
+    """
+    Serves canned results from disk so the pipeline can run offline.
+    `path` is either a JSON file mapping queries to results, or a directory
+    of `<normalized query>.txt` files.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path: str, default: str = ""):
+        self.path = path
+        self.default = default
+        self._results = {}
+        if os.path.isfile(path):
+            self._results = {normalize_query(k): v for k, v in load_file(path).items()}
+
+    def run(self, query: str) -> str:
+        key = normalize_query(query)
+        if key in self._results:
+            return self._results[key]
+        if os.path.isdir(self.path):
+            file = os.path.join(self.path, key.replace("/", "_") + ".txt")
+            if os.path.exists(file):
+                with open(file, "r") as f:
+                    return f.read()
+        return self.default
+
+
+class DiskTier:
+    """SQLite tier behind the in-memory LRU, keyed by normalized query and shared by processes."""
+
+    def __init__(self, path: str, ttl: int):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_results ("
+            "query TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM search_results WHERE query = ?", (key,)
+            ).fetchone()
+        if row and time.time() - row[1] <= self.ttl:
+            return row[0]
+        return None
+
+    def put(self, key: str, result: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results(query, result, created_at) VALUES (?, ?, ?)",
+                (key, result, time.time()),
+            )
+
+
+class CachedSearch:
+    """
+    Wraps a SearchProvider with a query-result cache (in-memory LRU plus an
+    optional disk tier), a per-call timeout and bounded retry with
+    exponential backoff. Concurrent misses for the same query share one
+    provider call, paced by the "search" rate limiter.
+    """
+
+    def __init__(self, provider: SearchProvider, max_entries: int = 256, disk: DiskTier = None,
+                 timeout: float = 10.0, retries: int = 2, backoff: float = 0.5):
+        self.provider = provider
+        self.max_entries = max_entries
+        self.disk = disk
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight("search")
+
+    def _remember(self, key: str, result: str):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _attempt(self, query: str) -> str:
+        """
+        One provider call on its own daemon thread. A call that hangs past the timeout is
+        abandoned there; it can't hold up later searches the way a shared worker pool would.
+        """
+        future = Future()
+
+        def target():
+            try:
+                future.set_result(self.provider.run(query))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, daemon=True, name="search").start()
+        return future.result(timeout=self.timeout)
+
+    def _call(self, query: str) -> str:
+        last_error = None
+        for attempt in range(self.retries + 1):
+            get_rate_limiter("search").acquire()
+            try:
+                return self._attempt(query)
+            except FutureTimeoutError:
+                last_error = TimeoutError(f"{self.provider.name} search timed out after {self.timeout}s")
+            except Exception as e:
+                last_error = e
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        raise SearchError(f"Search failed for {query!r}: {last_error}") from last_error
+
+    def run(self, query: str) -> str:
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                metrics.count("search_cache_hits")
+                return self._memory[key]
+        if self.disk is not None:
+            result = self.disk.get(key)
+            if result is not None:
+                self._remember(key, result)
+                metrics.count("search_cache_hits")
+                return result
+        metrics.count("search_cache_misses")
+        return self._flights.do(key, lambda: self._fetch(query, key))
+
+    def _fetch(self, query: str, key: str) -> str:
+        result = self._call(query)
+        self._remember(key, result)
+        if self.disk is not None:
+            self.disk.put(key, result)
+        return result
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def build_provider(name: str) -> SearchProvider:
+    from src.config import SEARCH_FIXTURES
+    if name == "fixture":
+        return FixtureProvider(SEARCH_FIXTURES)
+    if name == "duckduckgo":
+        return DuckDuckGoProvider()
+    raise ValueError(f"Unknown search provider: {name}")
+
+
+def get_search() -> CachedSearch:
+    """Returns the process wide cached search client configured from src.config."""
+    global _search
+    with _search_lock:
+        if _search is None:
+            from src.config import (
+                SEARCH_PROVIDER, SEARCH_CACHE_SIZE, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL,
+                SEARCH_TIMEOUT, SEARCH_RETRIES, SEARCH_BACKOFF,
+            )
+            disk = DiskTier(SEARCH_CACHE_PATH, SEARCH_CACHE_TTL) if SEARCH_CACHE_PATH else None
+            _search = CachedSearch(
+                build_provider(SEARCH_PROVIDER),
+                max_entries=SEARCH_CACHE_SIZE,
+                disk=disk,
+                timeout=SEARCH_TIMEOUT,
+                retries=SEARCH_RETRIES,
+                backoff=SEARCH_BACKOFF,
+            )
+    return _search
+
+
+def set_search(search: CachedSearch):
+    """Replaces the process wide search client (benchmarks, tests)."""
+    global _search
+    with _search_lock:
+        _search = search
@@ -0,0 +1,50 @@
+"""
+Single JSON layer for state payloads, data files and service responses.
+Uses orjson when it is installed (see playground/orj_test.py) and falls back
+to the stdlib. Output is compact unless `indent=True` is passed.
+"""
+import json
+import os
+import threading
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumpb(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return dumps(obj, indent).encode()
+
+
+def dumps(obj, indent: bool = False) -> str:
+    if orjson is not None:
+        return dumpb(obj, indent).decode()
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_file(obj, path: str, indent: bool = False):
+    """Writes through a temporary file and renames it, so readers never see a half-written file."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    data = dumpb(obj, indent)
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def load_file(path: str):
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,264 @@
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from src import metrics
+from src.inventory_store import get_inventory_store, normalize_name
+from src.serialization import dump_file, load_file
+from src.units import BASE_UNITS, convert, format_quantity, normalize_unit, parse_quantity, to_canonical
+
+# "garlic (g)": how `aggregate` labels an item's amounts in a unit it can't combine
+_LABEL = re.compile(r"^(.*\S)\s*\(([^()]+)\)$")
+
+
+def aggregate(rows) -> dict:
+    """
+    Sums `(key, name, quantity, unit)` rows in canonical units into `{name: {"quantity", "unit"}}`.
+    Mass and volume of the same item are combined when its density is known; amounts that still
+    can't be combined (e.g. "cloves" and "g") are listed as "name (unit)".
+    """
+    totals = {}
+    for key, name, quantity, unit in rows:
+        units = totals.setdefault(key, {"name": name, "units": {}})["units"]
+        if quantity is not None and unit not in units:
+            for other in units:
+                converted = convert(quantity, unit, other, name) if other in BASE_UNITS.values() else None
+                if converted is not None:
+                    quantity, unit = converted, other
+                    break
+        previous = units.get(unit)
+        if previous is None or quantity is None:
+            units[unit] = quantity if previous is None else previous
+        else:
+            units[unit] = previous + quantity
+
+    shopping = {}
+    for entry in totals.values():
+        for position, (unit, quantity) in enumerate(entry["units"].items()):
+            label = entry["name"] if position == 0 else f"{entry['name']} ({unit})"
+            shopping[label] = {"quantity": format_quantity(quantity), "unit": unit}
+    return shopping
+
+
+class ShoppingLedger:
+    """
+    Append-only shopping list kept in SQLite. Each run appends one row per
+    missing ingredient, in canonical units, to `shopping_log`; readers sum the
+    log on demand. The log is collapsed into `shopping_items` in a background
+    thread every `compact_every` rows, so concurrent runs never overwrite
+    each other and no run rewrites the whole list.
+    """
+
+    def __init__(self, path: str, compact_every: int = 50):
+        self.path = path
+        self.compact_every = compact_every
+        self._local = threading.local()
+        self._compacting = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shopping_items ("
+                "key TEXT NOT NULL, unit TEXT NOT NULL, name TEXT NOT NULL, quantity REAL, PRIMARY KEY (key, unit))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shopping_log ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, key TEXT NOT NULL, "
+                "name TEXT NOT NULL, quantity REAL, unit TEXT NOT NULL DEFAULT '')"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def is_empty(self) -> bool:
+        conn = self._connect()
+        return (
+            conn.execute("SELECT 1 FROM shopping_items LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM shopping_log LIMIT 1").fetchone() is None
+        )
+
+    def append(self, missing: dict):
+        """
+        Appends a run's missing list (`{ingredient: {"required", "unit"}}`) to the log. An entry's
+        optional `name` is the ingredient when its label differs, e.g. "garlic (cloves)".
+        """
+        rows = []
+        for item, details in missing.items():
+            item = details.get("name", item)
+            quantity, unit = to_canonical(parse_quantity(details.get("required")), details.get("unit", ""))
+            rows.append((time.time(), normalize_name(item), item, quantity, unit))
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT INTO shopping_log(ts, key, name, quantity, unit) VALUES (?, ?, ?, ?, ?)", rows)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        metrics.add_payload("shopping_list", written=metrics.payload_bytes(rows))
+        if last_id // self.compact_every > (last_id - len(rows)) // self.compact_every:
+            threading.Thread(target=self._compact_in_background, name="shopping-compact", daemon=True).start()
+
+    def _rows(self, conn, keys=None):
+        where, params = "", ()
+        if keys is not None:
+            where, params = f" WHERE key IN ({','.join('?' * len(keys))})", tuple(keys)
+        items = conn.execute(f"SELECT key, name, quantity, unit FROM shopping_items{where} ORDER BY rowid", params).fetchall()
+        log = conn.execute(f"SELECT key, name, quantity, unit FROM shopping_log{where} ORDER BY id", params).fetchall()
+        rows = items + log
+        metrics.add_payload("shopping_list", read=metrics.payload_bytes(rows))
+        return rows
+
+    def items(self) -> dict:
+        """The aggregated shopping list as `{name: {"quantity", "unit"}}`."""
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            return aggregate(self._rows(conn))
+        finally:
+            conn.rollback()
+
+    def compact(self):
+        """Collapses the log into `shopping_items`."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            last = conn.execute("SELECT MAX(id) FROM shopping_log").fetchone()[0]
+            if last is not None:
+                conn.execute(
+                    "INSERT INTO shopping_items(key, unit, name, quantity) "
+                    "SELECT key, unit, MIN(name), SUM(quantity) FROM shopping_log WHERE id <= ? GROUP BY key, unit "
+                    "ON CONFLICT(key, unit) DO UPDATE SET quantity = shopping_items.quantity + excluded.quantity",
+                    (last,),
+                )
+                conn.execute("DELETE FROM shopping_log WHERE id <= ?", (last,))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def _compact_in_background(self):
+        if not self._compacting.acquire(blocking=False):
+            return
+        try:
+            self.compact()
+        except sqlite3.OperationalError:
+            pass  # e.g. the database is busy; the next threshold tries again
+        finally:
+            self._compacting.release()
+
+    def _selected(self, conn, names):
+        """
+        Ledger rows for `names` (every row when None). An item name selects all of its units; a
+        "name (unit)" label, as `items()` prints amounts that can't be combined, selects that unit.
+        """
+        if names is None:
+            return self._rows(conn)
+        keys, labels = set(), set()
+        for name in names:
+            keys.add(normalize_name(name))
+            label = _LABEL.match(str(name).strip())
+            if label:
+                labels.add((normalize_name(label.group(1)), normalize_unit(label.group(2))))
+        lookup = sorted(keys | {key for key, _ in labels})
+        rows = self._rows(conn, lookup) if lookup else []
+        return [row for row in rows if row[0] in keys or (row[0], row[3]) in labels]
+
+    def mark_purchased(self, names=None) -> dict:
+        """
+        Removes the given items (all of them when `names` is None) from the list and adds the
+        bought amounts to the inventory as a single delta, in the unit each item is stocked in
+        (for a new item, the unit of its first amount). Amounts that can't be converted to that
+        unit (e.g. "g" of garlic stocked in "cloves") are removed too but not added; they are
+        reported as "name (unit)". Returns `{"added": delta, "skipped": [...]}`.
+        """
+        from src.name_index import get_name_index
+        store = get_inventory_store()
+        inventory = store.load()
+        index = get_name_index(inventory)
+        stocked = {normalize_name(name): (name, data.get("unit", "")) for name, data in inventory.get("items", {}).items()}
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._selected(conn, names)
+            targets = {}
+            for row in rows:
+                match = index.lookup(row[1])
+                targets.setdefault(normalize_name(match) if match is not None else row[0], []).append(row)
+            delta, skipped = {}, set()
+            for target, group in targets.items():
+                amounts = [(name, quantity, unit) for _, name, quantity, unit in group if quantity is not None]
+                if not amounts:
+                    continue
+                stock_name, stock_unit = stocked.get(target) or (amounts[0][0], amounts[0][2])
+                for name, quantity, unit in amounts:
+                    amount = convert(quantity, unit, stock_unit, name)
+                    if amount is None:
+                        skipped.add(f"{name} ({unit})")
+                        continue
+                    change = delta.setdefault(target, {"name": stock_name, "added": 0.0, "unit": stock_unit})
+                    change["added"] += amount
+            bought = {(key, unit) for key, _, _, unit in rows}
+            for table in ("shopping_items", "shopping_log"):
+                conn.executemany(f"DELETE FROM {table} WHERE key = ? AND unit = ?", bought)
+            store.append_delta({key: change for key, change in delta.items() if change["added"]})
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return {"added": delta, "skipped": sorted(skipped)}
+
+    def import_json(self, path: str):
+        """Appends a legacy `shopping_list.json` (`{name: {"quantity", "unit"}}`) to the ledger."""
+        items = load_file(path)
+        self.append({name: {"required": data.get("quantity"), "unit": data.get("unit", "")} for name, data in items.items()})
+
+    def export_json(self, path: str, indent: bool = False):
+        dump_file(self.items(), path, indent)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_shopping_ledger() -> ShoppingLedger:
+    """Returns the process wide ledger, importing a legacy `shopping_list.json` the first time it's created."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            from src.config import SHOPPING_LIST_DB, SHOPPING_LIST_JSON, SHOPPING_LIST_COMPACT_EVERY
+            ledger = ShoppingLedger(SHOPPING_LIST_DB, SHOPPING_LIST_COMPACT_EVERY)
+            if ledger.is_empty() and os.path.exists(SHOPPING_LIST_JSON):
+                ledger.import_json(SHOPPING_LIST_JSON)
+            _ledger = ledger
+    return _ledger
+
+
+def set_shopping_ledger(ledger: ShoppingLedger):
+    """Replaces the process wide ledger (benchmarks, tests)."""
+    global _ledger
+    _ledger = ledger
+
+
+if __name__ == "__main__":
+    # python -m src.shopping_ledger show|compact|export [path] [--pretty]|purchased [item ...]
+    pretty = "--pretty" in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != "--pretty"]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("show", "compact", "export", "purchased"):
+        sys.exit("usage: python -m src.shopping_ledger show|compact|export [path] [--pretty]|purchased [item ...]")
+    from src.config import SHOPPING_LIST_JSON
+    from src.serialization import dumps
+    ledger = get_shopping_ledger()
+    command, rest = sys.argv[1], sys.argv[2:]
+    if command == "show":
+        print(dumps(ledger.items(), indent=True))
+    elif command == "compact":
+        ledger.compact()
+    elif command == "export":
+        ledger.export_json(rest[0] if rest else SHOPPING_LIST_JSON, pretty)
+    else:
+        print(dumps(ledger.mark_purchased(rest or None), indent=True))
@@ -1,7 +1,17 @@
 from typing import Annotated, List, TypedDict
 from langchain_core.messages import BaseMessage
+from langgraph.graph.message import add_messages
 
-class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
-    inventory: dict
+class AgentState(TypedDict, total=False):
+    """
+    Pipeline state. Every node returns only the keys it changes, so nothing is
+    re-parsed from message content and checkpoints don't grow with each step.
+    """
+    messages: Annotated[List[BaseMessage], add_messages]
+    dish: str
     servings: int
+    recipe: dict  # Recipe tool-call args for the 2-serving base recipe
+    inventory: dict  # {"version": ...} of the run's inventory snapshot, for the name index
+    scaled_recipe: dict
+    missing_list: dict
+    inventory_delta: dict
@@ -0,0 +1,208 @@
+"""
+Shared call layer for the LLM and search providers: single-flight coalescing
+of identical in-flight calls, and a token-bucket scheduler that paces calls
+under requests-per-minute and tokens-per-minute limits, queueing them by
+priority instead of letting bursts run into provider rate limits.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from src import metrics
+
+# Lower runs first: interactive requests (CLI, service) ahead of batch and meal-plan work.
+INTERACTIVE = 0
+BATCH = 1
+
+_priority = ContextVar("foodie_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int):
+    """Queues provider calls made inside the block at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving while it's in flight share its result."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                metrics.count(f"{self.name}_coalesced")
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key, afn):
+        """Async variant of `do`; `afn` returns an awaitable. Works alongside sync callers of the same key."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await afn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute, each refilling continuously
+    up to one minute's allowance. Callers wait in a priority queue (then FIFO)
+    until both buckets cover their reservation. A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._stamp = time.monotonic()
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed, self._stamp = now - self._stamp, now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60)
+
+    def _grant(self, ticket, tokens: int):
+        """Seconds until `ticket` may retry, 0 once granted, or None if it isn't at the head of the queue."""
+        if self._queue[0] != ticket:
+            return None
+        self._refill()
+        tokens = min(tokens, self.tpm)
+        waits = []
+        if self.rpm and self._requests < 1:
+            waits.append((1 - self._requests) * 60 / self.rpm)
+        if self.tpm and self._tokens < tokens:
+            waits.append((tokens - self._tokens) * 60 / self.tpm)
+        if waits:
+            return max(waits)
+        if self.rpm:
+            self._requests -= 1
+        if self.tpm:
+            self._tokens -= tokens
+        heapq.heappop(self._queue)
+        self._cond.notify_all()
+        return 0
+
+    def _enqueue(self):
+        ticket = (_priority.get(), next(self._seq))
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _abandon(self, ticket):
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def acquire(self, tokens: int = 0):
+        """Blocks until one request of about `tokens` tokens may be sent."""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue()
+        try:
+            with self._cond:
+                while True:
+                    wait = self._grant(ticket, tokens)
+                    if wait == 0:
+                        break
+                    self._cond.wait(wait)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        metrics.count("rate_limit_wait_ms", int((time.perf_counter() - started) * 1000))
+
+    async def aacquire(self, tokens: int = 0):
+        """Async variant of `acquire`; waits without holding a thread."""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue()
+        try:
+            while True:
+                with self._cond:
+                    wait = self._grant(ticket, tokens)
+                if wait == 0:
+                    break
+                await asyncio.sleep(0.01 if wait is None else wait)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        metrics.count("rate_limit_wait_ms", int((time.perf_counter() - started) * 1000))
+
+    def settle(self, reserved: int, actual: int):
+        """Corrects the token bucket once a call's real usage is known."""
+        if self.tpm and actual:
+            with self._cond:
+                self._tokens += reserved - actual
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """Process wide limiter for a provider: "search" or an LLM tier."""
+    with _limiters_lock:
+        if name not in _limiters:
+            from src.config import LLM_RPM, LLM_TPM, SEARCH_RPM
+            _limiters[name] = RateLimiter(SEARCH_RPM) if name == "search" else RateLimiter(LLM_RPM, LLM_TPM)
+        return _limiters[name]
+
+
+def set_rate_limiter(name: str, limiter: RateLimiter):
+    """Replaces a provider's limiter (benchmarks, tests)."""
+    with _limiters_lock:
+        _limiters[name] = limiter
@@ -0,0 +1,291 @@
+"""
+Sampled, asynchronous tracing of graph runs. A sampled run gets a
+TraceRecorder callback that only appends the LangChain callback events to a
+list; nothing is serialized or sent while the run is in progress. When the
+run finishes the events are handed to a bounded queue, and a background
+thread exports them in batches to a sink: a local JSONL file or the Judgeval
+backend. When the queue is full, traces are dropped instead of slowing the run.
+"""
+import atexit
+import queue
+import random
+import sys
+import threading
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from src import metrics
+
+
+class TraceRecorder(BaseCallbackHandler):
+    """
+    Records one run's callback events in memory. Token streaming events are not recorded.
+    The time spent in these callbacks is counted as `trace_callback_us` on the run's metrics.
+    """
+
+    run_inline = True
+    raise_error = False
+
+    def __init__(self, exporter, trace_id: str = None):
+        self.exporter = exporter
+        self.trace_id = trace_id
+        self.events = []
+        self._overhead_ns = 0
+
+    def _record(self, event: str, args: tuple, run_id, parent_run_id, kwargs: dict):
+        started = time.perf_counter_ns()
+        self.events.append((event, time.time(), run_id, parent_run_id, args, kwargs))
+        if parent_run_id is None and event in ("on_chain_end", "on_chain_error"):
+            self.exporter.submit({"trace_id": self.trace_id or str(run_id), "events": self.events})
+            self.events = []
+            self._overhead_ns += time.perf_counter_ns() - started
+            metrics.count("trace_callback_us", self._overhead_ns // 1000)
+            self._overhead_ns = 0
+            return
+        self._overhead_ns += time.perf_counter_ns() - started
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_chain_start", (serialized, inputs), run_id, parent_run_id, kwargs)
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_chain_end", (outputs,), run_id, parent_run_id, kwargs)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_chain_error", (error,), run_id, parent_run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_chat_model_start", (serialized, messages), run_id, parent_run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_llm_start", (serialized, prompts), run_id, parent_run_id, kwargs)
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_llm_end", (response,), run_id, parent_run_id, kwargs)
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_llm_error", (error,), run_id, parent_run_id, kwargs)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_tool_start", (serialized, input_str), run_id, parent_run_id, kwargs)
+
+    def on_tool_end(self, output, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_tool_end", (output,), run_id, parent_run_id, kwargs)
+
+    def on_tool_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._record("on_tool_error", (error,), run_id, parent_run_id, kwargs)
+
+
+def _usage(response) -> dict:
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return dict(usage)
+    return {}
+
+
+def spans(events: list) -> list:
+    """Turns recorded events into spans with wall-clock start/end times, in completion order."""
+    started, finished = {}, []
+    for event, ts, run_id, parent_run_id, args, kwargs in events:
+        kind, phase = event[3:].rsplit("_", 1)
+        if phase == "start":
+            serialized = args[0] if isinstance(args[0], dict) else {}
+            metadata = kwargs.get("metadata") or {}
+            started[run_id] = {
+                "span_id": str(run_id),
+                "parent_id": str(parent_run_id) if parent_run_id else None,
+                "kind": "llm" if kind in ("llm", "chat_model") else kind,
+                "name": kwargs.get("name") or serialized.get("name") or kind,
+                "node": metadata.get("langgraph_node"),
+                "start": ts,
+            }
+            continue
+        span = started.pop(run_id, None)
+        if span is None:
+            continue
+        span["end"] = ts
+        span["duration_ms"] = (ts - span["start"]) * 1000
+        if phase == "error":
+            span["error"] = f"{type(args[0]).__name__}: {args[0]}"
+        elif kind == "llm":
+            span["usage"] = _usage(args[0])
+        finished.append(span)
+    return finished
+
+
+class FileSink:
+    """Appends each trace as one JSON line of spans."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, traces: list):
+        from src.serialization import dumpb
+        lines = [dumpb({"trace_id": trace["trace_id"], "spans": spans(trace["events"])}) + b"\n" for trace in traces]
+        with open(self.path, "ab") as f:
+            f.write(b"".join(lines))
+
+    def close(self):
+        pass
+
+
+class JudgevalSink:
+    """
+    Replays each recorded trace into a JudgevalCallbackHandler, off the request path.
+    The trace tree, inputs and outputs are the run's; Judgeval times spans by the replay.
+    """
+
+    def __init__(self, project_name: str):
+        from judgeval.common.tracer import Tracer
+        from judgeval.integrations.langgraph import JudgevalCallbackHandler
+        self.tracer = Tracer(project_name=project_name)
+        self._handler = JudgevalCallbackHandler
+
+    def export(self, traces: list):
+        from langchain_core.messages import get_buffer_string
+        for trace in traces:
+            handler = self._handler(self.tracer)
+            for event, _, run_id, parent_run_id, args, kwargs in trace["events"]:
+                try:
+                    getattr(handler, event)(*args, run_id=run_id, parent_run_id=parent_run_id, **kwargs)
+                except NotImplementedError:
+                    # Handlers without chat-model support get the messages as prompts, as LangChain does.
+                    serialized, messages = args
+                    prompts = [get_buffer_string(batch) for batch in messages]
+                    handler.on_llm_start(serialized, prompts, run_id=run_id, parent_run_id=parent_run_id, **kwargs)
+
+    def close(self):
+        pass
+
+
+class TraceExporter:
+    """
+    Bounded queue of finished traces, drained by a daemon thread that passes them to
+    `sink` in batches of up to `batch_size`, or whatever is queued after `interval` seconds.
+    """
+
+    def __init__(self, sink, max_queue: int = 1000, batch_size: int = 50, interval: float = 2.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.interval = interval
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="trace-export")
+        self._thread.start()
+
+    def submit(self, trace: dict) -> bool:
+        """Queues a finished trace without blocking; returns False when it was dropped."""
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+            metrics.count("traces_dropped")
+            return False
+        return True
+
+    def _export(self, batch: list):
+        if not batch:
+            return
+        try:
+            self.sink.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            metrics.count("traces_failed", len(batch))
+            sys.stderr.write(f"trace export failed: {type(e).__name__}: {e}\n")
+        batch.clear()
+
+    def _loop(self):
+        batch, deadline = [], None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event):
+                # flush(): everything queued before the marker goes out now.
+                self._export(batch)
+                deadline = None
+                item.set()
+                continue
+            if item is not None:
+                batch.append(item)
+                deadline = deadline or time.monotonic() + self.interval
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._export(batch)
+                deadline = None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until everything submitted so far was exported; returns False on timeout."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        self.flush(timeout)
+        self.sink.close()
+
+
+_exporter = None
+_exporter_ready = False
+_exporter_lock = threading.Lock()
+
+
+def _make_sink(mode: str):
+    from src.config import TRACE_FILE
+    if mode == "file":
+        return FileSink(TRACE_FILE)
+    if mode == "judgeval":
+        import os
+        return JudgevalSink(os.getenv("PROJECT_NAME"))
+    raise ValueError(f"Unknown FOODIE_TRACE mode: {mode!r}")
+
+
+def get_exporter():
+    """
+    The process wide exporter for FOODIE_TRACE, flushed at exit; None when tracing is off
+    or the sink can't be created (tracing is then disabled with a warning, never fatal).
+    """
+    global _exporter, _exporter_ready
+    with _exporter_lock:
+        if not _exporter_ready:
+            from src.config import TRACE_BATCH_SIZE, TRACE_FLUSH_SECONDS, TRACE_MODE, TRACE_QUEUE_SIZE
+            _exporter_ready = True
+            if TRACE_MODE != "off":
+                try:
+                    sink = _make_sink(TRACE_MODE)
+                except Exception as e:
+                    sys.stderr.write(f"tracing disabled: {type(e).__name__}: {e}\n")
+                else:
+                    _exporter = TraceExporter(sink, TRACE_QUEUE_SIZE, TRACE_BATCH_SIZE, TRACE_FLUSH_SECONDS)
+                    atexit.register(_exporter.close)
+    return _exporter
+
+
+def set_exporter(exporter):
+    """Replaces the process wide exporter; None turns tracing off (benchmarks, tests)."""
+    global _exporter, _exporter_ready
+    with _exporter_lock:
+        _exporter, _exporter_ready = exporter, True
+
+
+def callbacks(trace_id: str = None, sample_rate: float = None) -> list:
+    """
+    Callbacks for one graph invocation: a TraceRecorder for a sampled run, otherwise none,
+    so unsampled runs pay nothing. `sample_rate` defaults to FOODIE_TRACE_SAMPLE_RATE.
+    """
+    exporter = get_exporter()
+    if exporter is None:
+        return []
+    if sample_rate is None:
+        from src.config import TRACE_SAMPLE_RATE
+        sample_rate = TRACE_SAMPLE_RATE
+    if random.random() >= sample_rate:
+        return []
+    return [TraceRecorder(exporter, trace_id)]
@@ -0,0 +1,143 @@
+# Canonical unit -> (dimension, size in the dimension's base unit: ml or g)
+UNITS = {
+    "ml": ("volume", 1.0),
+    "l": ("volume", 1000.0),
+    "tsp": ("volume", 4.92892159375),
+    "tbsp": ("volume", 14.78676478125),
+    "cup": ("volume", 236.5882365),
+    "fl oz": ("volume", 29.5735295625),
+    "pint": ("volume", 473.176473),
+    "quart": ("volume", 946.352946),
+    "gallon": ("volume", 3785.411784),
+    "mg": ("mass", 0.001),
+    "g": ("mass", 1.0),
+    "kg": ("mass", 1000.0),
+    "oz": ("mass", 28.349523125),
+    "lb": ("mass", 453.59237),
+}
+
+BASE_UNITS = {"volume": "ml", "mass": "g"}
+
+UNIT_ALIASES = {
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp.": "tsp", "tsps": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp.": "tbsp", "tbsps": "tbsp", "tbs": "tbsp", "tbl": "tbsp",
+    "cups": "cup", "c": "cup",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml", "mls": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "fluid ounce": "fl oz", "fluid ounces": "fl oz", "fl. oz": "fl oz", "fl oz.": "fl oz",
+    "pints": "pint", "pt": "pint", "quarts": "quart", "qt": "quart", "gallons": "gallon", "gal": "gallon",
+    "milligram": "mg", "milligrams": "mg",
+    "gram": "g", "grams": "g", "gm": "g", "gms": "g", "gr": "g",
+    "kilogram": "kg", "kilograms": "kg", "kgs": "kg",
+    "ounce": "oz", "ounces": "oz", "oz.": "oz",
+    "pound": "lb", "pounds": "lb", "lbs": "lb", "lb.": "lb",
+    "clove": "cloves", "bunches": "bunch", "pinches": "pinch", "pieces": "piece", "pcs": "piece",
+}
+
+# One-letter abbreviations whose meaning depends on case ("T" tablespoon, "t" teaspoon);
+# looked up before the unit is lowercased.
+CASE_SENSITIVE_ALIASES = {"T": "tbsp", "T.": "tbsp", "t": "tsp", "t.": "tsp"}
+
+# Units whose amounts do not grow with the number of servings
+NON_SCALABLE_UNITS = {"to taste", "", "bunch", "medium", "pinch"}
+
+# Optional densities in g/ml, used to convert between volume and mass for an ingredient
+DENSITIES = {
+    "water": 1.0,
+    "milk": 1.03,
+    "heavy cream": 1.01,
+    "buttermilk": 1.03,
+    "curd": 1.03,
+    "yogurt": 1.03,
+    "butter": 0.96,
+    "unsalted butter": 0.96,
+    "ghee": 0.91,
+    "oil": 0.92,
+    "olive oil": 0.91,
+    "honey": 1.42,
+    "flour": 0.53,
+    "all-purpose flour": 0.53,
+    "sugar": 0.85,
+    "granulated sugar": 0.85,
+    "confectioners' sugar": 0.56,
+    "salt": 1.2,
+    "rice": 0.85,
+    "cocoa powder": 0.42,
+    "unsweetened cocoa powder": 0.42,
+    "baking powder": 0.9,
+    "baking soda": 0.96,
+    "spinach": 0.13,
+}
+
+# Precomputed factor for every same-dimension pair: amount_in_b = amount_in_a * _FACTORS[a, b]
+_FACTORS = {
+    (a, b): size_a / size_b
+    for a, (dim_a, size_a) in UNITS.items()
+    for b, (dim_b, size_b) in UNITS.items()
+    if dim_a == dim_b
+}
+
+
+def parse_quantity(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def format_quantity(amount) -> str:
+    if amount is None:
+        return ""
+    amount = round(amount, 4)
+    return str(amount) if amount % 1 else str(int(amount))
+
+
+def normalize_unit(unit) -> str:
+    """Maps unit spellings onto their canonical short name ("Tablespoons" -> "tbsp")."""
+    unit = " ".join(str(unit or "").split())
+    if unit in CASE_SENSITIVE_ALIASES:
+        return CASE_SENSITIVE_ALIASES[unit]
+    unit = unit.lower()
+    if "/" in unit:
+        # Legacy inventory entries such as "tsp/inch" recorded a unit mismatch; keep the first unit.
+        unit = unit.split("/", 1)[0].strip()
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def density(ingredient) -> float:
+    if ingredient is None:
+        return None
+    return DENSITIES.get(" ".join(str(ingredient).lower().split()))
+
+
+def convert(amount: float, from_unit, to_unit, ingredient=None):
+    """
+    Converts `amount` between units. Volume and mass convert through the ingredient's
+    density when one is known. Returns None when the units are not convertible.
+    """
+    from_unit, to_unit = normalize_unit(from_unit), normalize_unit(to_unit)
+    if from_unit == to_unit:
+        return amount
+    factor = _FACTORS.get((from_unit, to_unit))
+    if factor is not None:
+        return amount * factor
+    if from_unit not in UNITS or to_unit not in UNITS:
+        return None
+    grams_per_ml = density(ingredient)
+    if grams_per_ml is None:
+        return None
+    from_dim, from_size = UNITS[from_unit]
+    to_dim, to_size = UNITS[to_unit]
+    base = amount * from_size
+    base = base * grams_per_ml if from_dim == "volume" else base / grams_per_ml
+    return base / to_size
+
+
+def to_canonical(amount, unit):
+    """Expresses an amount in the base unit of its dimension (ml or g)."""
+    unit = normalize_unit(unit)
+    if unit not in UNITS or amount is None:
+        return amount, unit
+    dimension, size = UNITS[unit]
+    return amount * size, BASE_UNITS[dimension]
+
@@ -0,0 +1,14 @@
+from src.units import convert, normalize_unit
+
+
+def test_one_letter_spoon_abbreviations_keep_their_case():
+    assert normalize_unit("T") == "tbsp"
+    assert normalize_unit("t") == "tsp"
+    assert normalize_unit(" T. ") == "tbsp"
+    assert convert(1, "T", "t") == 3
+
+
+def test_spelled_out_units_are_case_insensitive():
+    assert normalize_unit("Tablespoons") == "tbsp"
+    assert normalize_unit("TSP") == "tsp"
+    assert normalize_unit("C") == "cup"